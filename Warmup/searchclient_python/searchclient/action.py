@@ -2,6 +2,9 @@ from enum import Enum, unique
 from typing import Literal #Literal is used to specify that a variable can only take on specific literal values, in this case -1, 0, or 1. 
 #This is useful for type checking and ensuring that the values passed to the Action class are valid.
 
+# (row delta, col delta) per direction, in the order N, S, E, W. Level.neighbours is indexed by these directions.
+DIRECTION_DELTAS = ((-1, 0), (1, 0), (0, 1), (0, -1))
+
 
 @unique # Decorator to ensure all enum values are unique
 class ActionType(Enum):
@@ -50,6 +53,8 @@ class Action(Enum):
         self.agent_col_delta = acd  # vertical displacement agent (-1,0,+1)
         self.box_row_delta = brd  # horisontal displacement box (-1,0,+1)
         self.box_col_delta = bcd  # vertical displacement box (-1,0,+1)
+        # Index into DIRECTION_DELTAS of the agent's move, or -1 if the agent stays put.
+        self.agent_direction = DIRECTION_DELTAS.index((ard, acd)) if (ard, acd) != (0, 0) else -1
 
 #Somewhere in other codefiles this from action import Action is called
 #Imports in this code as imported
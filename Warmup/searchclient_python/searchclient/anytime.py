@@ -0,0 +1,124 @@
+import heapq
+import itertools
+import math
+import sys
+import time
+
+from searchclient import idastar, memory
+from searchclient.action import Action
+from searchclient.heuristic import HeuristicWeightedAStar
+from searchclient.state import State
+
+
+def search(initial_state: State, heuristic: HeuristicWeightedAStar, time_limit: float) -> list[list[Action]] | None:
+    """
+    Anytime repairing A* (ARA*, Likhachev, Gordon and Thrun 2003).
+
+    A weighted A* search with heuristic.w finds a first plan quickly; the weight is then lowered by one and the search
+    resumed, repeatedly, down to plain A* at weight 1. Each round reuses the previous one instead of starting over:
+    the open list is re-keyed with the new weight, and states whose g improved after they were expanded in the round
+    (the INCONS list) are put back on it. A round ends once no open state has a lower key than the cost of the best
+    plan found so far. With an admissible heuristic (heuristic.admissible) that plan then costs at most w times the
+    optimum, and the bound is reported after every round, ending the search early once the plan is proven optimal.
+    Otherwise there is no guarantee and every weight down to 1 is tried.
+
+    The best plan so far is returned as soon as time_limit seconds have passed or memory.max_usage is nearly reached.
+    Without any plan at that point, the time limit gives up and the memory limit hands over to IDA* like graphsearch.
+    """
+    start_time = time.perf_counter()
+    counter = itertools.count()
+    # The State reached with the lowest g so far, per state; it also serves as the set of generated states.
+    best: dict[State, State] = {initial_state: initial_state}
+    h_values: dict[State, int] = {initial_state: heuristic.h(initial_state)}
+    open_list: list[tuple[int, int, int, State]] = []  # (g + w * h, h, counter, state); stale entries are skipped.
+    closed: set[State] = set()
+    incons: set[State] = set()
+    incumbent: State | None = initial_state if initial_state.is_goal_state() else None
+    expanded = 0
+
+    def push(state: State) -> None:
+        h = h_values[state]
+        heapq.heappush(open_list, (state.g + heuristic.w * h, h, next(counter), state))
+
+    push(initial_state)
+    while True:
+        # Improve the plan with the current weight.
+        while open_list and (incumbent is None or open_list[0][0] < incumbent.g):
+            state = heapq.heappop(open_list)[3]
+            if state in closed or best[state] is not state:
+                continue
+            closed.add(state)
+
+            expanded += 1
+            if expanded % 10000 == 0:
+                print_search_status(start_time, heuristic.w, expanded, best, incumbent)
+            out_of_time = time.perf_counter() - start_time > time_limit
+            if out_of_time or memory.sampled_usage() > memory.max_usage * memory.FALLBACK_FRACTION:
+                print_search_status(start_time, heuristic.w, expanded, best, incumbent)
+                if incumbent is not None:
+                    print(f"{'Time' if out_of_time else 'Memory'} limit reached.", file=sys.stderr, flush=True)
+                    return incumbent.extract_plan()
+                if out_of_time:
+                    print("Time limit reached. No solution found.", file=sys.stderr, flush=True)
+                    return None
+                table_size = max(len(best) // 2, 1)
+                best.clear()
+                h_values.clear()
+                open_list.clear()
+                closed.clear()
+                incons.clear()
+                print("Memory nearly exhausted. Continuing with IDA*.", file=sys.stderr, flush=True)
+                return idastar.search(initial_state, heuristic, table_size)
+
+            for child in state.get_expanded_states():
+                known = best.get(child)
+                if known is not None and known.g <= child.g:
+                    continue
+                best[child] = child
+                if known is None:
+                    h_values[child] = heuristic.h(child)
+                if child.is_goal_state():
+                    if incumbent is None or child.g < incumbent.g:
+                        incumbent = child
+                    continue
+                if child in closed:
+                    incons.add(child)
+                else:
+                    push(child)
+
+        print_search_status(start_time, heuristic.w, expanded, best, incumbent)
+        if incumbent is None:
+            print("Search space exhausted. No solution found.", file=sys.stderr, flush=True)
+            return None
+        remaining = [best[state] for state in incons]
+        remaining += [entry[3] for entry in open_list if entry[3] not in closed and best[entry[3]] is entry[3]]
+        bound = math.inf
+        if heuristic.admissible:
+            # Suboptimality bound of the incumbent: the optimum is at least the lowest g + h of the unexpanded states.
+            lowest = min((state.g + h_values[state] for state in remaining), default=math.inf)
+            bound = max(min(heuristic.w, incumbent.g / lowest) if lowest > 0 else heuristic.w, 1)
+            guarantee = f", within {bound:.2f} of optimal"
+        else:
+            guarantee = ""
+        print(f"Plan of length {incumbent.g} with weight {heuristic.w}{guarantee}.", file=sys.stderr, flush=True)
+        if heuristic.w <= 1 or bound <= 1:
+            print("Solution found.", file=sys.stderr, flush=True)
+            return incumbent.extract_plan()
+
+        # Lower the weight and resume from the open and inconsistent states, re-keyed.
+        heuristic.w -= 1
+        open_list = []
+        for state in dict.fromkeys(remaining):
+            push(state)
+        closed.clear()
+        incons.clear()
+
+
+def print_search_status(
+    start_time: float, weight: int, expanded: int, best: dict[State, State], incumbent: State | None
+) -> None:
+    plan = "none" if incumbent is None else f"{incumbent.g}"
+    memory.print_status(
+        start_time,
+        f"ARA* weight {weight}: #Expanded: {expanded:8,}, #Generated: {len(best):8,}, Incumbent: {plan}",
+    )
@@ -0,0 +1,121 @@
+import math
+from array import array
+
+from searchclient.level import UNREACHABLE
+
+
+class Assignment:
+    """
+    Minimum-cost matching of the goals of one box letter to the boxes of that letter, by the Hungarian method.
+
+    Rows are the goals, columns are the boxes and the cost of a pair is the goal's distance map at the box's cell.
+    The problem is padded to a square: extra rows (more boxes than goals) cost 0, extra columns (more goals than
+    boxes) cost UNREACHABLE.
+
+    The dual potentials u (rows) and v (columns) and the matching are kept between calls. When the boxes differ from
+    the previous call in only a few cells, the changed columns are unmatched, their potentials lowered until they are
+    feasible again, and only the freed rows are re-augmented: O(k n^2) for k moved boxes instead of O(n^3).
+    Search evaluates siblings and children one after the other, so the previous call is usually a box move away.
+    """
+
+    def __init__(self, goal_distances: list[array]) -> None:
+        self.goal_distances = goal_distances
+        self.columns: list[int] = []  # Box cell of every column, in matching order.
+        self.num_boxes = -1
+        self.size = 0
+        # 1-indexed, with row and column 0 as the search root of an augmentation.
+        self.u: list[int] = []
+        self.v: list[int] = []
+        self.match: list[int] = []  # Row matched to each column, 0 if none.
+        self.cost = 0
+
+    def solve(self, cells: list[int]) -> int:
+        """Returns the minimum total distance from the goals to distinct boxes at cells."""
+        if len(cells) != self.num_boxes:
+            self._rebuild(cells)
+            return self.cost
+
+        old_cells = set(self.columns[: self.num_boxes])
+        new_cells = set(cells)
+        added = [cell for cell in cells if cell not in old_cells]
+        if not added:
+            return self.cost
+        if 2 * len(added) > self.num_boxes:
+            self._rebuild(cells)
+            return self.cost
+
+        freed_rows = []
+        added_cells = iter(added)
+        for j in range(1, self.num_boxes + 1):
+            if self.columns[j - 1] in new_cells:
+                continue
+            self.columns[j - 1] = next(added_cells)
+            freed_rows.append(self.match[j])
+            self.match[j] = 0
+            # Lower the column potential so that every reduced cost in the column is non-negative again.
+            self.v[j] = min(self._cost(i, j) - self.u[i] for i in range(1, self.size + 1))
+        for row in freed_rows:
+            self._augment(row)
+        self._update_cost()
+        return self.cost
+
+    def _rebuild(self, cells: list[int]) -> None:
+        self.columns = list(cells)
+        self.num_boxes = len(cells)
+        self.size = max(len(self.goal_distances), self.num_boxes)
+        self.u = [0] * (self.size + 1)
+        self.v = [0] * (self.size + 1)
+        self.match = [0] * (self.size + 1)
+        for row in range(1, self.size + 1):
+            self._augment(row)
+        self._update_cost()
+
+    def _cost(self, row: int, column: int) -> int:
+        if row > len(self.goal_distances):
+            return 0
+        if column > self.num_boxes:
+            return UNREACHABLE
+        return self.goal_distances[row - 1][self.columns[column - 1]]
+
+    def _augment(self, row: int) -> None:
+        """Matches the free row along a shortest augmenting path in reduced costs, updating the potentials."""
+        size = self.size
+        u, v, match = self.u, self.v, self.match
+        cost = self._cost
+        min_slack = [math.inf] * (size + 1)
+        previous = [0] * (size + 1)
+        used = [False] * (size + 1)
+        match[0] = row
+        column = 0
+        while True:
+            used[column] = True
+            current_row = match[column]
+            delta = math.inf
+            next_column = 0
+            for j in range(1, size + 1):
+                if used[j]:
+                    continue
+                slack = cost(current_row, j) - u[current_row] - v[j]
+                if slack < min_slack[j]:
+                    min_slack[j] = slack
+                    previous[j] = column
+                if min_slack[j] < delta:
+                    delta = min_slack[j]
+                    next_column = j
+            for j in range(size + 1):
+                if used[j]:
+                    u[match[j]] += delta
+                    v[j] -= delta
+                else:
+                    min_slack[j] -= delta
+            column = next_column
+            if match[column] == 0:
+                break
+        while column:
+            previous_column = previous[column]
+            match[column] = match[previous_column]
+            column = previous_column
+
+    def _update_cost(self) -> None:
+        # Padding rows cost nothing, so this is the total over the real goals.
+        self.cost = sum(self._cost(self.match[j], j) for j in range(1, self.size + 1))
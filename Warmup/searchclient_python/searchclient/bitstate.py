@@ -0,0 +1,58 @@
+import math
+
+from searchclient.state import State
+
+
+class BitStateSet:
+    """
+    Approximate set of states (bitstate hashing, Holzmann 1998): a Bloom filter over the states' Zobrist hashes.
+
+    Each added state sets num_hashes bits of a fixed bit array, derived from its 60-bit hash by double hashing;
+    a state is reported present when all of its bits are set. The set itself keeps no State alive, so it takes a few
+    bits per state instead of a hash table entry, at the price of false positives: an unexplored state that is taken as
+    explored is silently pruned, which may lose the only (or the shortest) path to the goal. There are no false
+    negatives. The frontier's states still link back through their parents to most explored states, so these are only
+    freed when the search tree is kept in a NodePool instead (see graphsearch.search_pooled).
+    """
+
+    def __init__(self, size_bytes: int, num_hashes: int = 3) -> None:
+        self.bits = bytearray(size_bytes)
+        self.num_bits = size_bytes * 8
+        self.num_hashes = num_hashes
+        self.count = 0
+
+    def add(self, state: State) -> None:
+        bits, num_bits = self.bits, self.num_bits
+        key = hash(state)
+        index = key % num_bits
+        step = (key >> 30) | 1
+        for _ in range(self.num_hashes):
+            bits[index >> 3] |= 1 << (index & 7)
+            index = (index + step) % num_bits
+        self.count += 1
+
+    def clear(self) -> None:
+        # The old buffer is released before the new one is allocated: fall_back clears the set when memory is nearly
+        # used up, with no room for two of them.
+        size = len(self.bits)
+        self.bits = bytearray()
+        self.bits = bytearray(size)
+        self.count = 0
+
+    def false_positive_rate(self) -> float:
+        """Expected chance that a state never added is reported present, after count additions."""
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+    def __contains__(self, state: State) -> bool:
+        bits, num_bits = self.bits, self.num_bits
+        key = hash(state)
+        index = key % num_bits
+        step = (key >> 30) | 1
+        for _ in range(self.num_hashes):
+            if not bits[index >> 3] & (1 << (index & 7)):
+                return False
+            index = (index + step) % num_bits
+        return True
+
+    def __len__(self) -> int:
+        return self.count
@@ -0,0 +1,133 @@
+import heapq
+import sys
+import time
+from array import array
+
+from searchclient import memory
+from searchclient.action import Action
+from searchclient.spacetime import Constraints, box_goals_met, merge_paths, plan_agent
+from searchclient.state import State
+
+
+class CTNode:
+    """A node of the CBS constraint tree: per-agent constraints and the paths planned under them."""
+
+    __slots__ = ("constraints", "paths", "cost")
+
+    def __init__(self, constraints: list[Constraints], paths: list[list[int]]) -> None:
+        self.constraints = constraints
+        self.paths = paths
+        self.cost = sum(len(path) - 1 for path in paths)  # Sum of individual costs.
+
+
+def search(initial_state: State) -> list[list[Action]] | None:
+    """
+    Conflict-based search (Sharon et al. 2015).
+
+    The low level plans every agent on its own with space-time A* (spacetime.plan_agent). The high level is a
+    best-first search over a constraint tree: it finds the first conflict between two agents' paths and branches
+    into two nodes, each forbidding one of the two agents its part of the conflict, replanning only that agent.
+    Work therefore grows with the number of actual interactions instead of with the joint state space.
+
+    Only agents move in this domain, so boxes are static obstacles; levels whose box goals are not already met
+    cannot be solved and return None.
+    """
+    start_time = time.perf_counter()
+    level = State.level
+    num_agents = len(initial_state.agents)
+
+    if not box_goals_met(initial_state):
+        print("CBS: box goals are not met and boxes cannot move.", file=sys.stderr, flush=True)
+        return None
+
+    obstacles = frozenset(initial_state.boxes)
+    goals = level.agent_goals
+    distances: list[array | None] = [level.distances_from(goal, obstacles) if goal >= 0 else None for goal in goals]
+
+    def replan(agent: int, constraints: Constraints) -> list[int] | None:
+        return plan_agent(level, initial_state.agents[agent], goals[agent], distances[agent], obstacles, constraints)
+
+    root_constraints = [Constraints() for _ in range(num_agents)]
+    root_paths = []
+    for agent in range(num_agents):
+        path = replan(agent, root_constraints[agent])
+        if path is None:
+            print(f"CBS: agent {agent} cannot reach its goal.", file=sys.stderr, flush=True)
+            return None
+        root_paths.append(path)
+
+    root = CTNode(root_constraints, root_paths)
+    counter = 0
+    open_list = [(root.cost, counter, root)]
+    expanded = 0
+
+    while open_list:
+        _, _, node = heapq.heappop(open_list)
+        expanded += 1
+        if expanded % 100 == 0:
+            print_search_status(start_time, expanded, len(open_list))
+        if memory.sampled_usage() > memory.max_usage:
+            print_search_status(start_time, expanded, len(open_list))
+            print("Maximum memory usage exceeded.", file=sys.stderr, flush=True)
+            return None
+
+        conflict = find_conflict(node.paths)
+        if conflict is None:
+            print_search_status(start_time, expanded, len(open_list))
+            print("Solution found.", file=sys.stderr, flush=True)
+            return merge_paths(level, node.paths)
+
+        for agent, cell, t in conflict:
+            constraints = node.constraints[:]
+            constraints[agent] = constraints[agent].copy()
+            constraints[agent].add_vertex(cell, t)
+            path = replan(agent, constraints[agent])
+            if path is None:
+                continue
+            paths = node.paths[:]
+            paths[agent] = path
+            child = CTNode(constraints, paths)
+            counter += 1
+            heapq.heappush(open_list, (child.cost, counter, child))
+
+    print_search_status(start_time, expanded, 0)
+    print("Constraint tree exhausted. No solution found.", file=sys.stderr, flush=True)
+    return None
+
+
+def find_conflict(paths: list[list[int]]) -> tuple[tuple[int, int, int], tuple[int, int, int]] | None:
+    """
+    Returns the earliest conflict as the two (agent, cell, time) vertex constraints that each resolve it, or None.
+
+    Agents that have finished wait at their last cell. Two kinds of conflict exist in this domain:
+    vertex conflicts, two agents in the same cell at the same time, and follow conflicts, an agent moving into the
+    cell another agent occupied in the previous time step (actions require the destination to be free).
+    """
+    length = max(len(path) for path in paths)
+
+    def position(agent: int, t: int) -> int:
+        path = paths[agent]
+        return path[t] if t < len(path) else path[-1]
+
+    for t in range(length):
+        occupied: dict[int, int] = {}
+        for agent in range(len(paths)):
+            cell = position(agent, t)
+            other = occupied.get(cell)
+            if other is not None:
+                return (other, cell, t), (agent, cell, t)
+            occupied[cell] = agent
+
+        if t + 1 >= length:
+            break
+        for agent in range(len(paths)):
+            next_cell = position(agent, t + 1)
+            other = occupied.get(next_cell)
+            if next_cell != position(agent, t) and other is not None and other != agent:
+                return (agent, next_cell, t + 1), (other, next_cell, t)
+
+    return None
+
+
+def print_search_status(start_time: float, expanded: int, open_size: int) -> None:
+    memory.print_status(start_time, f"#CT expanded: {expanded:8,}, #CT open: {open_size:8,}")
@@ -0,0 +1,145 @@
+import heapq
+import mmap
+import os
+import sys
+import tempfile
+import time
+from collections.abc import Iterator
+
+from searchclient import memory
+from searchclient.action import Action
+from searchclient.record import RecordCodec
+from searchclient.state import State
+
+RUN_RECORDS = 1 << 19  # Children kept in memory before they are sorted and written out as a run.
+
+
+def search(initial_state: State, spill_dir: str | None = None) -> list[list[Action]] | None:
+    """
+    Breadth-first search with the layers on disk instead of in memory (Korf 2008, delayed duplicate detection).
+
+    Every layer is a file of sorted, unique records (see RecordCodec). A layer is expanded by streaming its file
+    through mmap; the children are collected in runs of at most RUN_RECORDS, each sorted and written out, and the runs
+    are then merged into the next layer, dropping records that occur in the current or previous layer. Every action
+    can be undone by the reverse move, so no older layer can hold them. Memory use is therefore bounded by one run
+    instead of by the size of the state space.
+
+    States read back from disk have no parents, so the plan is rebuilt backwards from the goal: each state's
+    predecessor is the one of its own children found in the previous layer file (binary search), re-expanded to get
+    the joint action between them.
+    """
+    start_time = time.perf_counter()
+    codec = RecordCodec(initial_state)
+    if initial_state.is_goal_state():
+        return []
+
+    with tempfile.TemporaryDirectory(prefix="searchclient-", dir=spill_dir) as directory:
+        layers = [os.path.join(directory, "layer-0.bin")]
+        with open(layers[0], "wb") as file:
+            file.write(codec.pack(initial_state))
+        generated = 1
+
+        while True:
+            depth = len(layers) - 1
+            runs: list[str] = []
+            children: set[bytes] = set()
+            for record in _records(layers[depth], codec.size):
+                state = codec.unpack(record)
+                for child in state.get_expanded_states():
+                    if child.is_goal_state():
+                        print_search_status(start_time, depth + 1, generated)
+                        print("Solution found.", file=sys.stderr, flush=True)
+                        return _reconstruct_plan(codec, layers, state) + [child.joint_action]
+                    children.add(codec.pack(child))
+                if len(children) >= RUN_RECORDS:
+                    runs.append(_write_run(directory, depth, len(runs), children))
+                    children = set()
+            if children:
+                runs.append(_write_run(directory, depth, len(runs), children))
+
+            layers.append(os.path.join(directory, f"layer-{depth + 1}.bin"))
+            layer_size = _merge_runs(runs, layers[max(depth - 1, 0) : depth + 1], layers[-1], codec.size)
+            for run in runs:
+                os.remove(run)
+            generated += layer_size
+            print_search_status(start_time, depth + 1, generated, layer_size)
+            if layer_size == 0:
+                print("Search space exhausted. No solution found.", file=sys.stderr, flush=True)
+                return None
+
+
+def _records(path: str, size: int) -> Iterator[bytes]:
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for offset in range(0, len(mapped), size):
+                yield mapped[offset : offset + size]
+
+
+def _write_run(directory: str, depth: int, index: int, records: set[bytes]) -> str:
+    path = os.path.join(directory, f"run-{depth}-{index}.bin")
+    with open(path, "wb") as file:
+        file.write(b"".join(sorted(records)))
+    return path
+
+
+def _merge_runs(runs: list[str], exclude: list[str], path: str, size: int) -> int:
+    """Merges the sorted runs into path, without duplicates or records found in the sorted exclude files."""
+    excluded = [_records(exclude_path, size) for exclude_path in exclude]
+    heads = [next(records, None) for records in excluded]
+    count = 0
+    last = None
+    with open(path, "wb") as file:
+        for record in heapq.merge(*(_records(run, size) for run in runs)):
+            if record == last:
+                continue
+            last = record
+            found = False
+            for i, records in enumerate(excluded):
+                while heads[i] is not None and heads[i] < record:
+                    heads[i] = next(records, None)
+                found = found or heads[i] == record
+            if not found:
+                file.write(record)
+                count += 1
+    return count
+
+
+def _find(path: str, record: bytes) -> bool:
+    size = len(record)
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return False
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            low, high = 0, len(mapped) // size
+            while low < high:
+                middle = (low + high) // 2
+                candidate = mapped[middle * size : (middle + 1) * size]
+                if candidate == record:
+                    return True
+                if candidate < record:
+                    low = middle + 1
+                else:
+                    high = middle
+    return False
+
+
+def _reconstruct_plan(codec: RecordCodec, layers: list[str], state: State) -> list[list[Action]]:
+    """Returns the actions leading from the initial state to state, which lies in the last layer."""
+    plan = []
+    for depth in range(len(layers) - 1, 0, -1):
+        predecessor = next(
+            codec.unpack(record)
+            for record in map(codec.pack, state.get_expanded_states())
+            if _find(layers[depth - 1], record)
+        )
+        plan.append(next(child for child in predecessor.get_expanded_states() if child == state).joint_action)
+        state = predecessor
+    plan.reverse()
+    return plan
+
+
+def print_search_status(start_time: float, depth: int, generated: int, layer_size: int | None = None) -> None:
+    layer = "" if layer_size is None else f", #Layer: {layer_size:8,}"
+    memory.print_status(start_time, f"Depth {depth}{layer}, #Generated: {generated:8,}")
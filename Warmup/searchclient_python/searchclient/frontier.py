@@ -1,6 +1,10 @@
+import heapq
+import itertools
 from abc import ABC, abstractmethod
 from collections import deque
+from collections.abc import Iterator
 
+from searchclient import memory
 from searchclient.heuristic import Heuristic
 from searchclient.state import State
 
@@ -21,9 +25,20 @@ class Frontier(ABC):
     @abstractmethod
     def contains(self, state: State) -> bool: ...
 
+    @abstractmethod
+    def clear(self) -> None: ...
+
     @abstractmethod
     def get_name(self) -> str: ...
 
+    @abstractmethod
+    def states(self) -> Iterator[State]: ...
+
+    def memory_estimate(self) -> float:
+        """Approximate MB held by the frontier's containers and states (see memory.structure_size)."""
+        containers = [value for value in vars(self).values() if isinstance(value, (list, deque, set, dict))]
+        return memory.structure_size(containers, self.size(), self.states())
+
 
 class FrontierBFS(Frontier):
     def __init__(self) -> None:
@@ -49,9 +64,16 @@ class FrontierBFS(Frontier):
     def contains(self, state: State) -> bool:
         return state in self.set
 
+    def clear(self) -> None:
+        self.queue.clear()
+        self.set.clear()
+
     def get_name(self) -> str:
         return "breadth-first search"
 
+    def states(self) -> Iterator[State]:
+        return iter(self.set)
+
 
 class FrontierDFS(Frontier):
     def __init__(self) -> None:
@@ -77,38 +99,150 @@ class FrontierDFS(Frontier):
     def contains(self, state: State) -> bool:
         return state in self.set
 
+    def clear(self) -> None:
+        self.stack.clear()
+        self.set.clear()
+
     def get_name(self) -> str:
         return "depth-first search"
 
+    def states(self) -> Iterator[State]:
+        return iter(self.set)
+
 
 class FrontierBestFirst(Frontier):
+    """
+    Binary heap ordered by heuristic.f, ties broken first-in first-out.
+
+    f is computed exactly once, when a state is added. Adding a state that is already in the frontier with a lower g
+    just pushes a second entry; the superseded entry stays in the heap and is skipped when it reaches the top (lazy
+    deletion). best_g maps every state in the frontier to the g of its live entry, which makes contains O(1).
+    """
+
     def __init__(self, heuristic: Heuristic) -> None:
         super().__init__()
         self.heuristic = heuristic
-        raise NotImplementedError
+        self.heap: list[tuple[int, int, State]] = []
+        self.best_g: dict[State, int] = {}
+        self.counter = itertools.count()
 
     def add(self, state: State) -> None:
-        raise NotImplementedError
+        best_g = self.best_g.get(state)
+        if best_g is not None and best_g <= state.g:
+            return
+        heapq.heappush(self.heap, (self.heuristic.f(state), next(self.counter), state))
+        self.best_g[state] = state.g
 
     def pop(self) -> State:
-        raise NotImplementedError
+        while True:
+            _, _, state = heapq.heappop(self.heap)
+            # Skip entries superseded by a cheaper copy of the state, or whose state was already popped.
+            if self.best_g.get(state) == state.g:
+                del self.best_g[state]
+                return state
 
     def is_empty(self) -> bool:
-        raise NotImplementedError
+        return len(self.best_g) == 0
 
     def size(self) -> int:
-        raise NotImplementedError
+        return len(self.best_g)
 
     def contains(self, state: State) -> bool:
-        raise NotImplementedError
+        return state in self.best_g
+
+    def clear(self) -> None:
+        self.heap.clear()
+        self.best_g.clear()
 
     def get_name(self) -> str:
         return f"best-first search using {self.heuristic}"
 
+    def states(self) -> Iterator[State]:
+        return iter(self.best_g)
+
+
+class FrontierBucket(Frontier):
+    """
+    Two-level bucket queue for integer f-values: buckets[f][h] holds the states with that f and h.
+
+    Pops take the lowest f and, among equal f, the lowest h, so A* runs through an f-plateau towards the goal instead
+    of expanding it breadth-first; states with equal f and h pop last-in first-out. min_f only moves forward between
+    adds of smaller f-values (and min_h[f] likewise), so add and pop are amortised O(1).
+    Like FrontierBestFirst, (f, h) is computed once per add and superseded entries are skipped lazily.
+    """
+
+    def __init__(self, heuristic: Heuristic) -> None:
+        super().__init__()
+        self.heuristic = heuristic
+        self.buckets: list[list[list[State]]] = []
+        self.counts: list[int] = []  # Entries (live or stale) per f-bucket.
+        self.min_h: list[int] = []  # Lowest h that may be non-empty, per f-bucket.
+        self.min_f = 0
+        self.best_g: dict[State, int] = {}
+
+    def add(self, state: State) -> None:
+        best_g = self.best_g.get(state)
+        if best_g is not None and best_g <= state.g:
+            return
+        f, h = self.heuristic.evaluate(state)
+        while len(self.buckets) <= f:
+            self.buckets.append([])
+            self.counts.append(0)
+            self.min_h.append(0)
+        bucket = self.buckets[f]
+        if len(bucket) <= h:
+            bucket.extend([] for _ in range(h + 1 - len(bucket)))
+            if self.counts[f] == 0:
+                self.min_h[f] = h
+        bucket[h].append(state)
+        self.counts[f] += 1
+        self.min_f = min(self.min_f, f)
+        self.min_h[f] = min(self.min_h[f], h)
+        self.best_g[state] = state.g
+
+    def pop(self) -> State:
+        while True:
+            while self.counts[self.min_f] == 0:
+                self.min_f += 1
+            f = self.min_f
+            bucket = self.buckets[f]
+            while not bucket[self.min_h[f]]:
+                self.min_h[f] += 1
+            state = bucket[self.min_h[f]].pop()
+            self.counts[f] -= 1
+            # Skip entries superseded by a cheaper copy of the state, or whose state was already popped.
+            if self.best_g.get(state) == state.g:
+                del self.best_g[state]
+                return state
+
+    def is_empty(self) -> bool:
+        return len(self.best_g) == 0
+
+    def size(self) -> int:
+        return len(self.best_g)
+
+    def contains(self, state: State) -> bool:
+        return state in self.best_g
+
+    def clear(self) -> None:
+        self.buckets.clear()
+        self.counts.clear()
+        self.min_h.clear()
+        self.min_f = 0
+        self.best_g.clear()
+
+    def get_name(self) -> str:
+        return f"bucket best-first search using {self.heuristic}"
+
+    def states(self) -> Iterator[State]:
+        return iter(self.best_g)
+
+
 #Frontier is a collection of states which are expanded but not yet explored(or generated).
 #Acts like to-do list for the search algorithm.
 '''
 FrontierBFS uses a deque to implement breadth-first search which stores states in FIFO order.
 It also maintains a set for O(1) containment checks meaning it can quickly determine if a state is already in the frontier.
-Need to implement FrontierDFS and FrontierBestFirst classes.
+FrontierDFS uses a list as a LIFO stack, and FrontierBestFirst a binary heap keyed on f with lazy deletion of
+superseded entries. FrontierBucket replaces the heap with buckets indexed by the integer f (then h) values.
 '''
\ No newline at end of file
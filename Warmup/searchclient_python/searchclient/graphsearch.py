@@ -1,15 +1,30 @@
 import sys
 import time
 
-from searchclient import memory
+from searchclient import idastar, memory
 from searchclient.action import Action
-from searchclient.frontier import Frontier
+from searchclient.bitstate import BitStateSet
+from searchclient.frontier import Frontier, FrontierBestFirst, FrontierBFS, FrontierBucket
+from searchclient.heuristic import HeuristicAStar
+from searchclient.nodepool import NodePool
 from searchclient.state import State
 
 start_time = time.perf_counter()
 
+# Undoing a move is the move in the opposite direction.
+REVERSE_ACTIONS = {
+    Action.NoOp: Action.NoOp,
+    Action.MoveN: Action.MoveS,
+    Action.MoveS: Action.MoveN,
+    Action.MoveE: Action.MoveW,
+    Action.MoveW: Action.MoveE,
+}
 
-def search(initial_state: State, frontier: Frontier) -> list[list[Action]] | None:
+
+def search(
+    initial_state: State, frontier: Frontier, explored: set[State] | BitStateSet | None = None
+) -> list[list[Action]] | None:
+    # explored defaults to an exact set; a BitStateSet trades a small chance of pruning unexplored states for memory.
     output_fixed_solution = False
 
     if output_fixed_solution:
@@ -51,17 +66,22 @@ def search(initial_state: State, frontier: Frontier) -> list[list[Action]] | Non
     iterations = 0
 
     frontier.add(initial_state)
-    explored: set[State] = set()
+    if explored is None:
+        explored = set()
+    # Corridor macros (State.corridor_macros) make step costs differ, so best-first search can reach a state more
+    # cheaply after generating or even expanding it. Cheaper copies then go to the frontier, which supersedes the
+    # dearer entry, and closed_g keeps the g of the explored states so they can be reopened (not with a BitStateSet).
+    cheaper_copies = State.corridor_macros and isinstance(frontier, (FrontierBestFirst, FrontierBucket))
+    closed_g: dict[State, int] | None = {} if cheaper_copies and isinstance(explored, set) else None
 
     while True:
         iterations += 1
         if iterations % 1000 == 0:
             print_search_status(explored, frontier)
 
-        if memory.get_usage() > memory.max_usage:
+        if memory.sampled_usage() > memory.max_usage * memory.FALLBACK_FRACTION:
             print_search_status(explored, frontier)
-            print("Maximum memory usage exceeded.", file=sys.stderr, flush=True)
-            return None
+            return fall_back(initial_state, explored, frontier)
 
         # Your code here...
         #Belw code added for Ex2, point3
@@ -84,22 +104,203 @@ def search(initial_state: State, frontier: Frontier) -> list[list[Action]] | Non
         
         #Add the state to the explored set
         explored.add(state)
+        if closed_g is not None:
+            closed_g[state] = state.g
         
         #Expand the state and add the new states to the frontier if they haven't been explored or aren't already in the frontier
         for child_state in state.get_expanded_states():
-            if child_state not in explored and not frontier.contains(child_state):
+            if closed_g is not None:
+                closed = closed_g.get(child_state)
+                if closed is None or child_state.g < closed:
+                    if closed is not None:
+                        explored.discard(child_state)
+                        del closed_g[child_state]
+                    frontier.add(child_state)
+            elif child_state not in explored and (cheaper_copies or not frontier.contains(child_state)):
                 frontier.add(child_state)
 ##############################################################################
 
-def print_search_status(explored: set[State], frontier: Frontier) -> None:
-    elapsed_time = time.perf_counter() - start_time
-    print(
+def search_pooled(
+    initial_state: State, frontier: Frontier, seen: BitStateSet | None = None
+) -> list[list[Action]] | None:
+    """
+    The graph search above with the search tree kept in a NodePool: children are interned as they are generated and
+    the frontier holds States without parent links, so only the frontier's States stay alive.
+    Generated states are never added twice, the same as the explored and frontier checks of search; given a
+    BitStateSet as seen, the pool checks that filter instead of keeping the records of expanded states.
+    """
+    iterations = 0
+
+    pool = NodePool(initial_state, seen)
+    pool.add(initial_state, -1)
+    frontier.add(initial_state)
+
+    while True:
+        iterations += 1
+        if iterations % 1000 == 0:
+            print_search_status(pool, frontier)
+
+        if memory.sampled_usage() > memory.max_usage * memory.FALLBACK_FRACTION:
+            print_search_status(pool, frontier)
+            return fall_back(initial_state, pool, frontier)
+
+        if frontier.is_empty():
+            print_search_status(pool, frontier)
+            print("Frontier is empty. No solution found.", file=sys.stderr, flush=True)
+            return None
+
+        state = frontier.pop()
+        node = pool.node(state)
+
+        if state.is_goal_state():
+            print_search_status(pool, frontier)
+            print("Solution found.", file=sys.stderr, flush=True)
+            return pool.extract_plan(node)
+
+        pool.expanded += 1
+        for child_state in state.get_expanded_states():
+            if pool.add(child_state, node) is not None:
+                frontier.add(child_state)
+
+
+def search_bidirectional(initial_state: State) -> list[list[Action]] | None:
+    """
+    Breadth-first search from both ends: forwards from initial_state and backwards from the goal state, the one with
+    every agent on its goal cell (boxes never move). Each round expands a whole layer of the side with the smaller
+    layer; the first child found in the other side's table joins two shortest half-plans into a shortest plan, since
+    no shorter one can have been missed by the earlier rounds. Each side searches about half the depth, so on long
+    corridors it expands roughly the square root of the states forward BFS would.
+
+    A joint action is undone by reversing every move: the cells the agents left are free afterwards and distinct, so
+    the backward search uses the ordinary successors and its half-plan is reversed action by action. It needs a single
+    goal state, so when an agent has no goal, or the goal state is not one (unmet box goals or a box on an agent
+    goal), it searches forwards only.
+    """
+    level = State.level
+    goal_state = State(tuple(level.agent_goals), initial_state.boxes)
+    if any(goal < 0 or goal in initial_state.boxes for goal in level.agent_goals) or not goal_state.is_goal_state():
+        print("The level has no single goal state; searching forwards only.", file=sys.stderr, flush=True)
+        return search(initial_state, FrontierBFS())
+    if initial_state == goal_state:
+        return []
+
+    forward: dict[State, State] = {initial_state: initial_state}
+    backward: dict[State, State] = {goal_state: goal_state}
+    forward_layer = [initial_state]
+    backward_layer = [goal_state]
+    expanded = 0
+
+    while forward_layer and backward_layer:
+        is_forward = len(forward_layer) <= len(backward_layer)
+        layer, visited, other = (
+            (forward_layer, forward, backward) if is_forward else (backward_layer, backward, forward)
+        )
+        next_layer = []
+        for state in layer:
+            expanded += 1
+            if expanded % 1000 == 0:
+                print_bidirectional_status(expanded, forward, backward)
+            if memory.sampled_usage() > memory.max_usage * memory.FALLBACK_FRACTION:
+                print_bidirectional_status(expanded, forward, backward)
+                table_size = max((len(forward) + len(backward)) // 2, 1)
+                forward.clear()
+                backward.clear()
+                print("Memory nearly exhausted. Continuing with IDA*.", file=sys.stderr, flush=True)
+                return idastar.search(initial_state, HeuristicAStar(initial_state), table_size)
+
+            for child_state in state.get_expanded_states():
+                if child_state in visited:
+                    continue
+                visited[child_state] = child_state
+                next_layer.append(child_state)
+                meeting = other.get(child_state)
+                if meeting is not None:
+                    print_bidirectional_status(expanded, forward, backward)
+                    print("Solution found.", file=sys.stderr, flush=True)
+                    forward_state, backward_state = (child_state, meeting) if is_forward else (meeting, child_state)
+                    backward_plan = backward_state.extract_plan()
+                    backward_plan.reverse()
+                    return forward_state.extract_plan() + [
+                        [REVERSE_ACTIONS[action] for action in joint_action] for joint_action in backward_plan
+                    ]
+        if is_forward:
+            forward_layer = next_layer
+        else:
+            backward_layer = next_layer
+
+    print_bidirectional_status(expanded, forward, backward)
+    print("Search space exhausted. No solution found.", file=sys.stderr, flush=True)
+    return None
+
+
+def fall_back(
+    initial_state: State, explored: set[State] | BitStateSet | NodePool, frontier: Frontier
+) -> list[list[Action]] | None:
+    """
+    Hands the search over to IDA* (idastar.search) once memory is nearly used up, instead of giving up.
+    The explored set and frontier are dropped and the transposition table may take half as many entries as they
+    held states, so IDA* keeps to the memory the graph search had reached. Best-first strategies lend it their
+    heuristic; BFS and DFS get the default A* heuristic.
+    """
+    heuristic = getattr(frontier, "heuristic", None)
+    if heuristic is None:
+        heuristic = HeuristicAStar(initial_state)
+    stored = frontier.size() + (len(explored) if isinstance(explored, set) else 0)
+    table_size = max(stored // 2, 1)
+    explored.clear()
+    frontier.clear()
+    print("Memory nearly exhausted. Continuing with IDA*.", file=sys.stderr, flush=True)
+    return idastar.search(initial_state, heuristic, table_size)
+
+
+def explored_size(explored: set[State] | BitStateSet | NodePool) -> float:
+    """Approximate MB held by the closed set of a graph search."""
+    if isinstance(explored, BitStateSet):
+        return len(explored.bits) / (1024 * 1024)
+    if isinstance(explored, NodePool):
+        buffers = [explored.ids, explored.parents, explored.actions, explored.g]
+        size = memory.structure_size(buffers, len(explored.ids), explored.ids)
+        return size if explored.seen is None else size + explored_size(explored.seen)
+    return memory.structure_size([explored], len(explored), explored)
+
+
+def print_bidirectional_status(expanded: int, forward: dict[State, State], backward: dict[State, State]) -> None:
+    memory.print_status(
+        start_time,
+        f"#Expanded: {expanded:8,}, #Forward: {len(forward):8,}, #Backward: {len(backward):8,}, "
+        f"#Generated: {len(forward) + len(backward):8,}",
+    )
+
+
+def print_search_status(explored: set[State] | BitStateSet | NodePool, frontier: Frontier) -> None:
+    memory.print_status(
+        start_time,
         f"#Expanded: {len(explored):8,}, #Frontier: {frontier.size():8,}, "
-        f"#Generated: {len(explored) + frontier.size():8,}, Time: {elapsed_time:3.3f} s\n"
-        f"[Alloc: {memory.get_usage():4.2f} MB, MaxAlloc: {memory.max_usage:4.2f} MB]",
-        file=sys.stderr,
-        flush=True,
+        f"#Generated: {len(explored) + frontier.size():8,}",
     )
+    if memory.report_structures:
+        print(
+            f"[Estimate: explored {explored_size(explored):4.2f} MB, frontier {frontier.memory_estimate():4.2f} MB]",
+            file=sys.stderr,
+            flush=True,
+        )
+    bitstate = explored.seen if isinstance(explored, NodePool) else explored
+    if isinstance(bitstate, BitStateSet):
+        print(
+            f"[Bitstate: {bitstate.num_bits // (8 * 1024 * 1024):,} MB, {bitstate.num_hashes} bits per state, "
+            f"estimated false-positive rate {bitstate.false_positive_rate():.2e}]",
+            file=sys.stderr,
+            flush=True,
+        )
+    heuristic = getattr(frontier, "heuristic", None)
+    if heuristic is not None and heuristic.cache_size:
+        lookups = heuristic.cache_hits + heuristic.cache_misses
+        print(
+            f"[h-cache: {heuristic.cache_hits:,} hits, {heuristic.cache_misses:,} misses "
+            f"({heuristic.cache_hits / max(lookups, 1):.1%}), {len(heuristic.cache):,}/{heuristic.cache_size:,} entries]",
+            file=sys.stderr,
+            flush=True,
+        )
     print(f'#Explored: {len(explored)}', flush=True)
     print(f"#Generated: {len(explored) + frontier.size()}", flush=True)
     print(f"#Alloc: {memory.get_usage():.2f} MB", flush=True)
@@ -0,0 +1,234 @@
+import heapq
+import math
+import multiprocessing
+import queue
+import sys
+import time
+from array import array
+
+from searchclient import memory
+from searchclient.action import Action
+from searchclient.heuristic import HeuristicAStar
+from searchclient.record import RecordCodec
+
+ACTIONS = list(Action)
+_ACTION_INDEX = {action: index for index, action in enumerate(ACTIONS)}
+BATCH_SIZE = 256  # Children buffered per destination worker before they are sent.
+EXPANSIONS_PER_POLL = 64  # Expansions between two checks of the inbox.
+
+
+def search(level_text: str, args_text: list[str], num_workers: int, max_memory: float) -> list[list[Action]] | None:
+    """
+    Hash-distributed A* (Kishimoto, Fukunaga and Botea 2009).
+
+    Every worker process owns the states whose Zobrist hash is equal to its number modulo num_workers, and keeps its
+    own open list, closed table and part of the search tree. Generated children are sent to their owner in batches of
+    (record, g, parent worker, parent node, joint action) over its inbox queue, so a state is only ever expanded by
+    one worker and duplicates are detected locally. A goal popped by any worker becomes the shared incumbent; workers
+    then skip states with f >= its cost, so once all work is done the incumbent is optimal (with respect to h).
+
+    Termination: each worker counts the batches it sent and received and flags itself idle when it has nothing
+    below the incumbent to expand. The search is over when two consecutive snapshots taken by this process find all
+    workers idle, equal totals sent and received, and unchanged counters in between, as no message can be in flight.
+    The plan is then traced back from the goal by asking each worker for the parent of the node it owns.
+
+    args_text are the program arguments for the workers. They attach to the level index published by this process
+    (see SearchClient.worker_state) and only parse the rest of the level text themselves.
+    """
+    from searchclient.searchclient import SearchClient
+
+    start_time = time.perf_counter()
+    initial_state, block = SearchClient.share_level(level_text)
+    channels = Channels(num_workers)
+    worker_args = [*args_text, "--max-memory", str(max_memory / num_workers)]
+    workers = [
+        multiprocessing.Process(
+            target=_worker,
+            args=(worker, channels, level_text, block.name, worker_args),
+            daemon=True,
+        )
+        for worker in range(num_workers)
+    ]
+    for process in workers:
+        process.start()
+
+    try:
+        # The initial state travels like any other child, without a parent.
+        channels.sent[num_workers] += 1
+        channels.inboxes[hash(initial_state) % num_workers].put(
+            [(RecordCodec(initial_state).pack(initial_state), 0, -1, -1, ())]
+        )
+
+        last_snapshot = None
+        last_status = start_time
+        while not channels.failed.value:
+            time.sleep(0.01)
+            snapshot = (tuple(channels.idle), tuple(channels.sent), tuple(channels.received))
+            if all(snapshot[0]) and sum(snapshot[1]) == sum(snapshot[2]) and snapshot == last_snapshot:
+                break
+            last_snapshot = snapshot
+            if time.perf_counter() - last_status > 1:
+                last_status = time.perf_counter()
+                print_search_status(start_time, channels)
+
+        print_search_status(start_time, channels)
+        if channels.failed.value:
+            print("A worker exceeded its memory share.", file=sys.stderr, flush=True)
+            return None
+        cost, worker, node = channels.incumbent
+        if cost == math.inf:
+            print("Search space exhausted. No solution found.", file=sys.stderr, flush=True)
+            return None
+
+        print("Solution found.", file=sys.stderr, flush=True)
+        plan = []
+        worker, node = int(worker), int(node)
+        while True:
+            channels.inboxes[worker].put(("trace", node))
+            parent_worker, parent_node, joint_action = channels.replies.get()
+            if parent_worker < 0:
+                break
+            plan.append([ACTIONS[index] for index in joint_action])
+            worker, node = parent_worker, parent_node
+        plan.reverse()
+        return plan
+    finally:
+        for inbox in channels.inboxes:
+            inbox.put(("stop", 0))
+        for process in workers:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+        block.close()
+        block.unlink()
+
+
+class Channels:
+    """The queues and shared counters between the coordinating process and the workers."""
+
+    def __init__(self, num_workers: int) -> None:
+        self.inboxes = [multiprocessing.Queue() for _ in range(num_workers)]
+        self.replies = multiprocessing.Queue()  # Answers to trace requests.
+        # Each entry is written by one process only, so no locks. Index num_workers of sent is the coordinator.
+        self.sent = multiprocessing.Array("q", num_workers + 1, lock=False)
+        self.received = multiprocessing.Array("q", num_workers, lock=False)
+        self.idle = multiprocessing.Array("b", num_workers, lock=False)
+        self.expanded = multiprocessing.Array("q", num_workers, lock=False)
+        # Cost, worker and node of the best goal found; read without the lock, which only guards updates.
+        self.incumbent = multiprocessing.Array("d", [math.inf, -1, -1], lock=False)
+        self.incumbent_lock = multiprocessing.Lock()
+        self.failed = multiprocessing.Value("b", 0, lock=False)
+
+
+def _worker(worker: int, channels: Channels, level_text: str, block_name: str, args_text: list[str]) -> None:
+    """Worker process: expands the states it owns until told to stop."""
+    from searchclient.searchclient import SearchClient
+
+    args, initial_state = SearchClient.worker_state(args_text, level_text, block_name)
+    heuristic = HeuristicAStar(initial_state, args.heuristic)
+    codec = RecordCodec(initial_state)
+    num_workers = len(channels.inboxes)
+    inboxes, incumbent = channels.inboxes, channels.incumbent
+
+    # This worker's part of the search tree, by local node ID.
+    ids: dict[bytes, int] = {}
+    records: list[bytes] = []
+    g_values = array("I")
+    parent_workers = array("i")
+    parent_nodes = array("i")
+    actions: list[tuple[int, ...]] = []
+    closed = bytearray()
+
+    open_list: list[tuple[int, int, int]] = []  # (f, g, node); superseded entries are skipped on pop.
+    outboxes: list[list[tuple]] = [[] for _ in range(num_workers)]
+
+    def receive(batch: list[tuple]) -> None:
+        for record, g, parent_worker, parent_node, joint_action in batch:
+            node = ids.get(record)
+            if node is None:
+                node = ids[record] = len(records)
+                records.append(record)
+                g_values.append(g)
+                parent_workers.append(parent_worker)
+                parent_nodes.append(parent_node)
+                actions.append(joint_action)
+                closed.append(0)
+            elif g < g_values[node]:
+                g_values[node] = g
+                parent_workers[node] = parent_worker
+                parent_nodes[node] = parent_node
+                actions[node] = joint_action
+                closed[node] = 0
+            else:
+                continue
+            f = g + heuristic.h(codec.unpack(record))
+            if f < incumbent[0]:
+                heapq.heappush(open_list, (f, g, node))
+
+    def send(destination: int) -> None:
+        channels.sent[worker] += 1
+        inboxes[destination].put(outboxes[destination])
+        outboxes[destination] = []
+
+    inbox = inboxes[worker]
+    while True:
+        # Drain the inbox; wait for messages only when there is nothing below the incumbent to expand.
+        while True:
+            has_work = bool(open_list) and open_list[0][0] < incumbent[0]
+            try:
+                message = inbox.get(block=not has_work, timeout=None if has_work else 0.05)
+            except queue.Empty:
+                if has_work:
+                    break
+                channels.idle[worker] = 1
+                continue
+            channels.idle[worker] = 0
+            if isinstance(message, list):
+                channels.received[worker] += 1
+                receive(message)
+            elif message[0] == "trace":
+                node = message[1]
+                channels.replies.put((parent_workers[node], parent_nodes[node], actions[node]))
+            else:
+                return
+
+        for _ in range(EXPANSIONS_PER_POLL):
+            if not open_list or open_list[0][0] >= incumbent[0]:
+                break
+            _, g, node = heapq.heappop(open_list)
+            if closed[node] or g != g_values[node]:
+                continue
+            closed[node] = 1
+            state = codec.unpack(records[node])
+            if state.is_goal_state():
+                with channels.incumbent_lock:
+                    if g < incumbent[0]:
+                        incumbent[0], incumbent[1], incumbent[2] = g, worker, node
+                continue
+            channels.expanded[worker] += 1
+            for child in state.get_expanded_states():
+                destination = hash(child) % num_workers
+                joint_action = tuple(_ACTION_INDEX[action] for action in child.joint_action)
+                outboxes[destination].append((codec.pack(child), g + 1, worker, node, joint_action))
+                if len(outboxes[destination]) >= BATCH_SIZE:
+                    send(destination)
+        for destination in range(num_workers):
+            if outboxes[destination]:
+                send(destination)
+
+        if memory.sampled_usage() > memory.max_usage:
+            channels.failed.value = 1
+            return
+
+
+def print_search_status(start_time: float, channels: Channels) -> None:
+    elapsed_time = time.perf_counter() - start_time
+    expanded = list(channels.expanded)
+    total = sum(expanded)
+    cost = channels.incumbent[0]
+    best = "none" if cost == math.inf else f"{cost:.0f}"
+    memory.print_status(
+        start_time,
+        f"HDA* #Expanded: {total:8,} ({' '.join(f'{count:,}' for count in expanded)}), "
+        f"{total / max(elapsed_time, 1e-9):,.0f}/s, Incumbent: {best}",
+    )
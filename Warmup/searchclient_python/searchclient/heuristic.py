@@ -1,52 +1,163 @@
 from abc import ABC, abstractmethod
+from array import array
+from collections import OrderedDict
 
+from searchclient.assignment import Assignment
+from searchclient.level import UNREACHABLE
 from searchclient.state import State
 
+ESTIMATORS = ("goalcount", "distance", "matching")
+
+
 #All abstract methods in a abstract class must be implemented in all the child classes. If a child class does not implement all the abstract methods, then it will also be an abstract class and cannot be instantiated.
 class Heuristic(ABC):
-    def __init__(self, initial_state: State) -> None:
+    def __init__(self, initial_state: State, estimator: str = "distance", admissible: bool = False) -> None:
         # Here's a chance to pre-process the static parts of the level.
-        pass
+        # One BFS over the walls from every goal cell gives the true distance from any cell to that goal, so h is a
+        # handful of table lookups instead of any pathfinding.
+        if estimator not in ESTIMATORS:
+            raise ValueError(f"Unknown heuristic estimator: {estimator}.")
+        self.estimator = estimator
+        # All agents move in one joint action, so sums over the agents overestimate on multi-agent levels. An
+        # admissible heuristic takes the largest agent distance instead, and counts goals per joint action.
+        self.admissible = admissible
+        self.num_agents = len(initial_state.agents)
+        level = State.level
+        self.agent_distances: list[tuple[int, array]] = [
+            (agent, level.goal_distances(goal)) for agent, goal in enumerate(level.agent_goals) if goal >= 0
+        ]
+        self.box_distances: list[tuple[str, array]] = [
+            (letter, level.goal_distances(goal)) for goal, letter in level.box_goals.items()
+        ]
+        goals_by_letter: dict[str, list[array]] = {}
+        for letter, distances in self.box_distances:
+            goals_by_letter.setdefault(letter, []).append(distances)
+        self.assignments = {letter: Assignment(distances) for letter, distances in goals_by_letter.items()}
+        # Box positions of the last matching; consecutive states usually share the same boxes dict.
+        self._matched_boxes: dict[int, str] | None = None
+        self._matched_cost = 0
+
+        # Optional LRU cache of h-values keyed by state hash; cache_size is the maximum number of entries, 0 disables it.
+        # Zobrist hashes are 60 bits wide, so a collision returning another state's value is negligible.
+        self.cache_size = 0
+        self.cache: OrderedDict[int, int] = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
 
     def h(self, state: State) -> int:
-        raise NotImplementedError
+        if not self.cache_size:
+            return self.estimate(state)
+        key = hash(state)
+        value = self.cache.get(key)
+        if value is not None:
+            self.cache.move_to_end(key)
+            self.cache_hits += 1
+            return value
+        self.cache_misses += 1
+        value = self.estimate(state)
+        self.cache[key] = value
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return value
+
+    def estimate(self, state: State) -> int:
+        if self.estimator == "goalcount":
+            # The number of goal cells not yet holding their agent or box, maintained by State.result.
+            # A joint action reaches at most one goal per agent.
+            if self.admissible:
+                return -(-state.unsatisfied // self.num_agents)
+            return state.unsatisfied
+        if self.estimator == "matching":
+            return self.agent_distance(state) + self.box_matching(state)
+        return self.goal_distance(state)
+
+    def agent_distance(self, state: State) -> int:
+        agents = state.agents
+        if self.admissible:
+            return max((distances[agents[agent]] for agent, distances in self.agent_distances), default=0)
+        return sum(distances[agents[agent]] for agent, distances in self.agent_distances)
+
+    def box_matching(self, state: State) -> int:
+        """
+        Sum over the box letters of the minimum-cost matching between goals and distinct boxes (see Assignment).
+        Unlike the nearest-box distance, two goals cannot count the same box, so levels with many boxes of one letter
+        are not badly underestimated. Each Assignment repairs its previous matching instead of solving from scratch.
+        """
+        boxes = state.boxes
+        if boxes is self._matched_boxes:
+            return self._matched_cost
+        cells_by_letter: dict[str, list[int]] = {letter: [] for letter in self.assignments}
+        for cell, letter in boxes.items():
+            cells = cells_by_letter.get(letter)
+            if cells is not None:
+                cells.append(cell)
+        cost = sum(self.assignments[letter].solve(cells) for letter, cells in cells_by_letter.items())
+        self._matched_boxes = boxes
+        self._matched_cost = cost
+        return cost
+
+    def goal_distance(self, state: State) -> int:
+        """
+        Sum over the goals of the shortest-path distance (through walls only) to the agent or nearest box that belongs
+        there. Unlike Manhattan distance it follows the corridors of maze levels. Several agents move in a single
+        joint action, so unless admissible is set (agents then count by their largest distance) it can overestimate
+        on multi-agent levels. Box distances never overestimate: boxes cannot move, so unmet box goals are unreachable.
+        """
+        total = self.agent_distance(state)
+        if self.box_distances:
+            boxes = state.boxes
+            for letter, distances in self.box_distances:
+                total += min(
+                    (distances[cell] for cell, box_letter in boxes.items() if box_letter == letter),
+                    default=UNREACHABLE,
+                )
+        return total
+
+    def f(self, state: State) -> int:
+        return self.combine(state.g, self.h(state))
+
+    def evaluate(self, state: State) -> tuple[int, int]:
+        """Returns (f, h) with a single call to h, for frontiers that also order on h."""
+        h = self.h(state)
+        return self.combine(state.g, h), h
 
     @abstractmethod
-    def f(self, state: State) -> int: ...
+    def combine(self, g: int, h: int) -> int: ...
 
     @abstractmethod
     def __repr__(self) -> str: ...
 
 
 class HeuristicAStar(Heuristic):
-    def __init__(self, initial_state: State) -> None:
-        super().__init__(initial_state)
+    def __init__(self, initial_state: State, estimator: str = "distance") -> None:
+        # Admissible, so A* plans are optimal.
+        super().__init__(initial_state, estimator, admissible=True)
 
-    def f(self, state: State) -> int:
-        return state.g + self.h(state)
+    def combine(self, g: int, h: int) -> int:
+        return g + h
 
     def __repr__(self) -> str:
         return "A* evaluation"
 
 
 class HeuristicWeightedAStar(Heuristic):
-    def __init__(self, initial_state: State, w: int) -> None:
-        super().__init__(initial_state)
+    def __init__(self, initial_state: State, w: int, estimator: str = "distance", admissible: bool = False) -> None:
+        super().__init__(initial_state, estimator, admissible)
         self.w = w
 
-    def f(self, state: State) -> int:
-        return state.g + self.w * self.h(state)
+    def combine(self, g: int, h: int) -> int:
+        return g + self.w * h
 
     def __repr__(self) -> str:
         return f"WA*({self.w}) evaluation"
 
 
 class HeuristicGreedy(Heuristic):
-    def __init__(self, initial_state: State) -> None:
-        super().__init__(initial_state)
+    def __init__(self, initial_state: State, estimator: str = "distance") -> None:
+        super().__init__(initial_state, estimator)
 
-    def f(self, state: State) -> int:
-        return self.h(state)
+    def combine(self, g: int, h: int) -> int:
+        return h
 
     def __repr__(self) -> str:
         return "greedy evaluation"
@@ -62,27 +173,29 @@ Parameters:
     self - the heuristic object instance
     state: State - the state to evaluate
     Return type: int - estimated cost from state to goal
-Current implementation: Raises NotImplementedError
+Current implementation: goal count, the sum of true goal distances looked up in the maps built by __init__, or those
+agent distances plus a goal-to-box matching cost
 """
 
 """
-HeuristicAstar class returns state.g  + self.h(state) in its f(state) method, which is the standard A* evaluation function combining the cost to reach the current state (g) and the heuristic estimate to reach the goal (h).
+HeuristicAstar class returns state.g  + self.h(state) in its f(state) method (through combine(g, h)), which is the standard A* evaluation function combining the cost to reach the current state (g) and the heuristic estimate to reach the goal (h).
 i.e., f(n) = g(n) + h(n)
 g(n) and h(n) are exploration and exploitation respectively.
 
-HeuristicGreedy class returns self.h(state) in its f(state) method, which is the standard greedy evaluation function that relies solely on the heuristic estimate to reach the goal, ignoring the cost to reach the current state.
+HeuristicGreedy class returns self.h(state) in its f(state) method (through combine(g, h)), which is the standard greedy evaluation function that relies solely on the heuristic estimate to reach the goal, ignoring the cost to reach the current state.
 i.e., f(n) = h(n)
 
-HeuristicWeightedAStar class returns state.g + self.w * self.h(state) in its f(state) method, which is a weighted A* evaluation function that combines the cost to reach the current state (g) with a weighted heuristic estimate to reach the goal (w * h). The weight w allows for tuning the influence of the heuristic in the search process.
+HeuristicWeightedAStar class returns state.g + self.w * self.h(state) in its f(state) method (through combine(g, h)), which is a weighted A* evaluation function that combines the cost to reach the current state (g) with a weighted heuristic estimate to reach the goal (w * h). The weight w allows for tuning the influence of the heuristic in the search process.
 i.e., f(n) = g(n) + w * h(n)
 """
 
 """
 All heuristics share:
-    h(state) method (you implement the heuristic logic once)
-    __init__ for preprocessing
+    h(state) method (you implement the heuristic logic once, in estimate(state); h adds the optional cache and the
+    estimator argument picks goal count, goal distance or matching)
+    __init__ for preprocessing (the per-goal distance maps)
 But differ in:
-    How f(state) combines g and h
+    How f(state) combines g and h (the combine(g, h) method each of them implements)
     Search behavior and guarantees
 """
 
@@ -0,0 +1,72 @@
+import math
+import sys
+import time
+from collections.abc import Iterator
+
+from searchclient import memory
+from searchclient.action import Action
+from searchclient.heuristic import Heuristic
+from searchclient.state import State
+
+
+def search(initial_state: State, heuristic: Heuristic, table_size: int) -> list[list[Action]] | None:
+    """
+    Iterative-deepening A* (Korf 1985) with a bounded transposition table.
+
+    Depth-first searches are repeated with a growing bound on g + h, each time raised to the smallest f that exceeded
+    the previous bound. Only the current path and the table are kept in memory: the table maps the hashes of states
+    seen in the current iteration to the lowest g they were reached with, pruning repeated states and cycles, and
+    stops taking new entries once it holds table_size of them.
+
+    Used by graphsearch when the explored set and frontier have nearly filled memory.max_usage; heuristic values are
+    recomputed in every iteration, so a --h-cache helps here.
+    """
+    start_time = time.perf_counter()
+    bound = heuristic.h(initial_state)
+    expanded = 0
+    iteration = 0
+
+    while True:
+        iteration += 1
+        table: dict[int, int] = {hash(initial_state): 0}
+        next_bound = math.inf
+        stack: list[Iterator[State]] = [initial_state.get_expanded_states()]
+
+        while stack:
+            child = next(stack[-1], None)
+            if child is None:
+                stack.pop()
+                continue
+
+            f = child.g + heuristic.h(child)
+            if f > bound:
+                next_bound = min(next_bound, f)
+                continue
+            key = hash(child)
+            seen_g = table.get(key)
+            if seen_g is not None and seen_g <= child.g:
+                continue
+            if seen_g is not None or len(table) < table_size:
+                table[key] = child.g
+
+            if child.is_goal_state():
+                print_search_status(start_time, iteration, bound, expanded, table)
+                print("Solution found.", file=sys.stderr, flush=True)
+                return child.extract_plan()
+
+            expanded += 1
+            if expanded % 10000 == 0:
+                print_search_status(start_time, iteration, bound, expanded, table)
+            stack.append(child.get_expanded_states())
+
+        print_search_status(start_time, iteration, bound, expanded, table)
+        if next_bound == math.inf:
+            print("Search space exhausted. No solution found.", file=sys.stderr, flush=True)
+            return None
+        bound = next_bound
+
+
+def print_search_status(start_time: float, iteration: int, bound: int, expanded: int, table: dict[int, int]) -> None:
+    memory.print_status(
+        start_time, f"IDA* iteration {iteration}, bound {bound}: #Expanded: {expanded:8,}, #Table: {len(table):8,}"
+    )
@@ -0,0 +1,105 @@
+import argparse
+import io
+import sys
+import time
+
+from searchclient import memory
+from searchclient.action import Action
+from searchclient.cbs import find_conflict
+from searchclient.spacetime import merge_paths
+from searchclient.state import State
+
+
+def search(args: argparse.Namespace, level_text: str) -> list[list[Action]] | None:
+    """
+    Independence detection (Standley 2010) ahead of the search strategy selected by args.
+
+    Every agent starts in a group of its own. Each group is solved on its own by the selected strategy, on a copy of
+    the level without the other agents (see group_level); its plan is replayed into one path of cells per agent.
+    The paths of all agents are then checked together for the first conflict (cbs.find_conflict): if there is none
+    they are merged into the joint plan, otherwise the two groups involved are merged and solved jointly, and the
+    check is repeated. The joint searches are only as large as the largest group of agents that actually interact.
+
+    Boxes cannot move in this domain, so every group keeps all boxes, as obstacles, whatever their colour.
+    """
+    from searchclient.searchclient import SearchClient
+
+    start_time = time.perf_counter()
+    initial_state = SearchClient.parse_level(io.StringIO(level_text))
+    level = State.level
+    num_agents = len(initial_state.agents)
+    groups = [[agent] for agent in range(num_agents)]
+    paths: list[list[int]] = [[cell] for cell in initial_state.agents]
+
+    def solve(group: list[int]) -> bool:
+        print(f"Independence detection: solving agents {group}.", file=sys.stderr, flush=True)
+        plan = SearchClient.solve(args, SearchClient.initial_state(args, group_level(level_text, group)))
+        if plan is None:
+            return False
+        neighbours = level.neighbours
+        for index, agent in enumerate(group):
+            cell = initial_state.agents[agent]
+            path = [cell]
+            for joint_action in plan:
+                action = joint_action[index]
+                if action is not Action.NoOp:
+                    cell = neighbours[cell * 4 + action.agent_direction]
+                path.append(cell)
+            paths[agent] = path
+        return True
+
+    for group in groups:
+        if not solve(group):
+            return None
+
+    while True:
+        print_search_status(start_time, groups)
+        conflict = find_conflict(paths)
+        if conflict is None:
+            print("Solution found.", file=sys.stderr, flush=True)
+            return merge_paths(level, paths)
+        if memory.get_usage() > memory.max_usage:
+            print("Maximum memory usage exceeded.", file=sys.stderr, flush=True)
+            return None
+
+        (first, _, _), (second, _, _) = conflict
+        first_group = next(group for group in groups if first in group)
+        second_group = next(group for group in groups if second in group)
+        merged = sorted(first_group + second_group)
+        groups = [group for group in groups if group is not first_group and group is not second_group] + [merged]
+        if not solve(merged):
+            return None
+
+
+def group_level(level_text: str, group: list[int]) -> str:
+    """
+    Returns level_text with only the agents in group, renumbered 0, 1, ... in their order in group.
+    The other agents, their goals and their colour entries are removed; walls and boxes are unchanged.
+    """
+    numbers = {str(agent): str(index) for index, agent in enumerate(group)}
+    lines = []
+    section = ""
+    for line in level_text.splitlines(keepends=True):
+        if line.startswith("#"):
+            section = line.strip()
+        elif section == "#colors":
+            color, entities = line.split(":")
+            kept = [
+                numbers.get(entity, entity)
+                for entity in (entity.strip() for entity in entities.split(","))
+                if not "0" <= entity <= "9" or entity in numbers
+            ]
+            if not kept:
+                continue
+            line = f"{color}: {', '.join(kept)}\n"
+        elif section in ("#initial", "#goal"):
+            line = "".join(numbers.get(c, " ") if "0" <= c <= "9" else c for c in line)
+        lines.append(line)
+    return "".join(lines)
+
+
+def print_search_status(start_time: float, groups: list[list[int]]) -> None:
+    memory.print_status(
+        start_time,
+        f"Independence detection: {len(groups)} groups, largest {max(len(group) for group in groups)} agents",
+    )
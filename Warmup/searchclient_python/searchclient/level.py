@@ -0,0 +1,132 @@
+from array import array
+from collections import deque
+
+from searchclient.action import DIRECTION_DELTAS
+
+UNREACHABLE = 0xFFFF  # Distance of cells that cannot be reached; the largest value an array("H") can hold.
+_OPPOSITE = (1, 0, 3, 2)  # The reverse of each direction of DIRECTION_DELTAS.
+
+
+class Level:
+    """
+    Static index of a level, built once by SearchClient.parse_level.
+
+    Every non-wall cell gets a dense integer ID, numbered row by row from the top-left.
+    States, actions and heuristics work on these IDs instead of (row, col) pairs, so the hot loops never index the
+    nested walls lists and levels that are mostly walls only pay for their free cells.
+
+    neighbours[cell * 4 + direction] is the ID of the adjacent cell in that direction (see action.DIRECTION_DELTAS),
+    or -1 if it is a wall or outside the level.
+
+    The goal cells are listed once as well: agent_goals[agent] is the goal cell of each agent (-1 if it has none) and
+    box_goals maps each box goal cell to its letter.
+
+    corridors() tells, for every move, how a single agent has to continue it through the corridor it enters.
+    """
+
+    def __init__(self, walls: list[list[bool]], goals: list[list[str]], num_agents: int) -> None:
+        self.num_rows = len(walls)
+        self.num_cols = len(walls[0]) if walls else 0
+
+        self.cell_ids: list[int] = [-1] * (self.num_rows * self.num_cols)  # Indexed by row * num_cols + col.
+        self.cell_rows: list[int] = []  # Indexed by cell ID.
+        self.cell_cols: list[int] = []  # Indexed by cell ID.
+        for row in range(self.num_rows):
+            for col in range(self.num_cols):
+                if not walls[row][col]:
+                    self.cell_ids[row * self.num_cols + col] = len(self.cell_rows)
+                    self.cell_rows.append(row)
+                    self.cell_cols.append(col)
+        self.num_cells = len(self.cell_rows)
+
+        self.neighbours: list[int] = [-1] * (self.num_cells * len(DIRECTION_DELTAS))
+        for cell in range(self.num_cells):
+            for direction, (row_delta, col_delta) in enumerate(DIRECTION_DELTAS):
+                self.neighbours[cell * 4 + direction] = self.cell_at(
+                    self.cell_rows[cell] + row_delta, self.cell_cols[cell] + col_delta
+                )
+
+        self.agent_goals: list[int] = [-1] * num_agents
+        self.box_goals: dict[int, str] = {}
+        for row, goal_row in enumerate(goals):
+            for col, goal in enumerate(goal_row):
+                if "0" <= goal <= "9":
+                    self.agent_goals[ord(goal) - ord("0")] = self.cell_at(row, col)
+                elif "A" <= goal <= "Z":
+                    self.box_goals[self.cell_at(row, col)] = goal
+
+        # Wall-only distance maps to single goal cells, filled on demand by goal_distances (or by sharedlevel.attach).
+        self.goal_distance_tables: dict[int, array] = {}
+        # Shared memory block holding the buffers above, for a Level made by sharedlevel.attach.
+        self.shared_block = None
+        # Continuations of the moves through corridors, built on first use by corridors.
+        self.corridor_table: array | None = None
+
+    def cell_at(self, row: int, col: int) -> int:
+        """Returns the ID of the cell at (row, col), or -1 if it is a wall or outside the level."""
+        if 0 <= row < self.num_rows and 0 <= col < self.num_cols:
+            return self.cell_ids[row * self.num_cols + col]
+        return -1
+
+    def position(self, cell: int) -> tuple[int, int]:
+        return self.cell_rows[cell], self.cell_cols[cell]
+
+    def goal_distances(self, goal: int) -> array:
+        """distances_from(goal) around the walls only, computed once per goal."""
+        distances = self.goal_distance_tables.get(goal)
+        if distances is None:
+            distances = self.goal_distance_tables[goal] = self.distances_from(goal)
+        return distances
+
+    def corridors(self) -> array:
+        """
+        Indexed like neighbours: the direction in which a lone agent moving from cell in direction must go on, or -1.
+        A corridor cell has exactly two free neighbours and is not an agent goal; an agent entering one can only go on
+        or turn back, so chaining these steps walks it to the next junction, dead end or agent goal. Built on first use.
+        """
+        if self.corridor_table is None:
+            neighbours = self.neighbours
+            agent_goals = set(self.agent_goals)
+            table = array("b", [-1]) * (self.num_cells * 4)
+            for cell in range(self.num_cells):
+                free = [direction for direction in range(4) if neighbours[cell * 4 + direction] >= 0]
+                if len(free) != 2 or cell in agent_goals:
+                    continue
+                # Entering through one free side means leaving through the other.
+                for entry, onward in ((free[0], free[1]), (free[1], free[0])):
+                    previous = neighbours[cell * 4 + entry]
+                    table[previous * 4 + _OPPOSITE[entry]] = onward
+            self.corridor_table = table
+        return self.corridor_table
+
+    def distances_from(self, source: int, blocked: set[int] | frozenset[int] = frozenset()) -> array:
+        """
+        Breadth-first search over the free cells from source.
+        Returns the number of moves from source to every cell, indexed by cell ID, as an array("H").
+        Cells in blocked are treated as walls; cells that cannot be reached get UNREACHABLE.
+        """
+        distances = array("H", [UNREACHABLE]) * self.num_cells
+        distances[source] = 0
+        neighbours = self.neighbours
+        queue = deque([source])
+        while queue:
+            cell = queue.popleft()
+            next_distance = distances[cell] + 1
+            for neighbour in neighbours[cell * 4 : cell * 4 + 4]:
+                if neighbour >= 0 and distances[neighbour] == UNREACHABLE and neighbour not in blocked:
+                    distances[neighbour] = next_distance
+                    queue.append(neighbour)
+        return distances
+
+
+"""
+Example, for the level
+    +++++
+    +0  +
+    + + +
+    +++++
+the free cells are numbered
+    (1,1) -> 0, (1,2) -> 1, (1,3) -> 2, (2,1) -> 3, (2,3) -> 4
+and the neighbour table for cell 1 (north, south, east, west) is
+    neighbours[4:8] = [-1, -1, 2, 0]
+"""
@@ -1,10 +1,24 @@
+import sys
+import time
+from collections.abc import Iterable
+from itertools import islice
 from math import inf
 
 import psutil #psutil is a cross-platform library for retrieving information on running processes and system utilization (CPU, memory, disks, network, sensors) in Python.
 #meaning that psutil can be used to monitor and manage system resources, including memory usage, which is relevant for the search client to ensure it does not exceed the specified maximum memory limit.
 
 max_usage = inf
+# Share of max_usage at which graph search hands over to memory-bounded IDA* (see graphsearch.fall_back).
+FALLBACK_FRACTION = 0.9
+# Most calls to sampled_usage between two reads of the process' memory; fewer as usage nears max_usage.
+check_interval = 1000
+# Whether the search status also estimates the size of the explored set and the frontier (see structure_size).
+report_structures = False
+SAMPLE_SIZE = 64  # Items measured by structure_size.
+
 _process = psutil.Process()
+_countdown = 0
+_last_usage = 0.0
 
 
 def get_usage() -> float:
@@ -12,3 +26,51 @@ def get_usage() -> float:
     usage = _process.memory_info().rss / (1024 * 1024)
     assert isinstance(usage, float)
     return usage
+
+
+def print_status(start_time: float, status: str) -> None:
+    """Prints a search status line to stderr, followed by the time since start_time and the memory usage."""
+    elapsed_time = time.perf_counter() - start_time
+    print(
+        f"{status}, Time: {elapsed_time:3.3f} s\n[Alloc: {get_usage():4.2f} MB, MaxAlloc: {max_usage:4.2f} MB]",
+        file=sys.stderr,
+        flush=True,
+    )
+
+
+def sampled_usage() -> float:
+    """
+    Returns memory usage in MB like get_usage, but only reads it from the OS every few calls, for checks inside
+    the search loop. The interval shrinks with the remaining headroom below max_usage (down to every call with 10%
+    left), so the limit is not overrun between samples.
+    """
+    global _countdown, _last_usage
+    _countdown -= 1
+    if _countdown <= 0:
+        _last_usage = get_usage()
+        headroom = 1.0 if max_usage == inf else max(1.0 - _last_usage / max_usage, 0.0)
+        _countdown = max(int(check_interval * min(1.0, 2 * (headroom - 0.1))), 1)
+    return _last_usage
+
+
+def structure_size(containers: Iterable[object], count: int, sample: Iterable[object]) -> float:
+    """
+    Estimates the MB held by a data structure: the containers themselves, plus count items as large on average as
+    the first SAMPLE_SIZE items of sample. An item's size includes the tuples and lists in its slots (a state's agents
+    and joint action) but not other shared objects, such as the boxes map children share with their parent.
+    """
+    size = sum(sys.getsizeof(container) for container in containers)
+    items = list(islice(sample, SAMPLE_SIZE))
+    if items:
+        size += count * sum(_object_size(item) for item in items) / len(items)
+    return size / (1024 * 1024)
+
+
+def _object_size(item: object) -> int:
+    size = sys.getsizeof(item)
+    for cls in type(item).__mro__:
+        for slot in getattr(cls, "__slots__", ()):
+            value = getattr(item, slot, None)
+            if isinstance(value, (tuple, list)):
+                size += sys.getsizeof(value)
+    return size
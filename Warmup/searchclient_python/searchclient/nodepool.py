@@ -0,0 +1,92 @@
+from array import array
+
+from searchclient.action import Action
+from searchclient.bitstate import BitStateSet
+from searchclient.record import RecordCodec
+from searchclient.state import State
+
+
+class NodePool:
+    """
+    Search nodes as parallel typed arrays instead of State objects linked by parent pointers.
+
+    Every state the search generates is interned once, by its packed record (see RecordCodec), and gets an integer
+    node ID. parents[node], actions[node] and g[node] then hold the parent's node ID (-1 for the root), the index of
+    the joint action that led to it in joint_actions, and its path cost: 12 bytes of array storage per node. Since the
+    tree lives in the arrays, States can drop their parent and joint action as soon as they are interned, and are
+    freed once popped from the frontier.
+
+    ids maps records to node IDs, so it doubles as the closed set of a graph search (it holds every generated state).
+    Given a BitStateSet as seen, the pool asks that filter instead whether a state was generated before, and ids only
+    keeps the states not yet popped: the records of expanded states are dropped too, leaving the filter's bits and
+    the 12 bytes per node, at the risk of the filter's false positives.
+    """
+
+    def __init__(self, initial_state: State, seen: BitStateSet | None = None) -> None:
+        self.codec = RecordCodec(initial_state)
+        self.ids: dict[bytes, int] = {}
+        self.seen = seen
+        self.parents = array("i")
+        self.actions = array("I")
+        self.g = array("I")
+        self.joint_actions: list[list[Action]] = []
+        self.joint_action_ids: dict[tuple[Action, ...], int] = {}
+        self.expanded = 0
+
+    def add(self, state: State, parent: int) -> int | None:
+        """
+        Interns state as a child of node parent (-1 for the root) and detaches it from its parent State.
+        Returns its node ID, or None if the state was interned before.
+        """
+        key = self.codec.pack(state)
+        if self.seen is None:
+            if key in self.ids:
+                return None
+        elif state in self.seen:
+            return None
+        else:
+            self.seen.add(state)
+        node = len(self.parents)
+        self.ids[key] = node
+        self.parents.append(parent)
+        self.g.append(state.g)
+        joint_action = state.joint_action
+        if joint_action is None:
+            self.actions.append(0)
+        else:
+            action_key = tuple(joint_action)
+            action = self.joint_action_ids.get(action_key)
+            if action is None:
+                action = self.joint_action_ids[action_key] = len(self.joint_actions)
+                self.joint_actions.append(joint_action)
+            self.actions.append(action)
+        state.parent = None
+        state.joint_action = None
+        return node
+
+    def node(self, state: State) -> int:
+        """Returns the node ID of state. With a seen filter, this is the state being popped and its record is dropped."""
+        key = self.codec.pack(state)
+        if self.seen is None:
+            return self.ids[key]
+        return self.ids.pop(key)
+
+    def extract_plan(self, node: int) -> list[list[Action]]:
+        plan = []
+        while self.parents[node] >= 0:
+            plan.append(self.joint_actions[self.actions[node]])
+            node = self.parents[node]
+        plan.reverse()
+        return plan
+
+    def clear(self) -> None:
+        self.ids.clear()
+        if self.seen is not None:
+            self.seen.clear()
+        self.parents = array("i")
+        self.actions = array("I")
+        self.g = array("I")
+
+    def __len__(self) -> int:
+        # Reported as #Expanded by the search status; the generated states are these plus the frontier.
+        return self.expanded
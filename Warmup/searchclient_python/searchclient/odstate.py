@@ -0,0 +1,112 @@
+from collections.abc import Iterator
+
+from searchclient.action import Action
+from searchclient.state import MOVE_ACTIONS, State
+
+_HASH_MASK = (1 << 60) - 1
+
+
+class ODState(State):
+    """
+    State for operator decomposition (Standley 2010): instead of branching over every joint action at once, the agents
+    choose their action for the current time step one at a time, through intermediate states.
+
+    next_agent is the agent whose action is decided next; 0 means the state is a regular (full) state.
+    origin holds the agent positions at the start of the time step, since all actions of a step must be applicable
+    in that state. In intermediate states the agents before next_agent are already at their new cells and
+    joint_action holds their actions so far; in full states it is the complete joint action that led here.
+
+    Every expansion has at most five children, and the heuristic is evaluated after every single agent decision, so
+    best-first search can cut a bad branch before the other agents multiply it.
+    """
+
+    __slots__ = ("next_agent", "origin")
+
+    def __init__(self, agents: tuple[int, ...], boxes: dict[int, str], unsatisfied: int | None = None) -> None:
+        super().__init__(agents, boxes, unsatisfied)
+        self.next_agent = 0
+        self.origin = agents
+
+    @staticmethod
+    def from_state(state: State) -> "ODState":
+        return ODState(state.agents, state.boxes, state.unsatisfied)
+
+    def get_expanded_states(self) -> Iterator["State"]:
+        agent = self.next_agent
+        cell = self.agents[agent]
+        neighbours = State.level.neighbours
+
+        expanded_states = [self._child(agent, Action.NoOp, cell)]
+        for action in MOVE_ACTIONS:
+            destination = neighbours[cell * 4 + action.agent_direction]
+            # The cell must be free at the start of the step (origin) and not claimed by an agent that already moved.
+            if (
+                destination >= 0
+                and destination not in self.boxes
+                and destination not in self.origin
+                and destination not in self.agents
+            ):
+                expanded_states.append(self._child(agent, action, destination))
+
+        if State.shuffle_expansions:
+            State._RNG.shuffle(expanded_states)
+        return iter(expanded_states)
+
+    def _child(self, agent: int, action: Action, destination: int) -> "ODState":
+        cell = self.agents[agent]
+        copy_agents = list(self.agents)
+        copy_agents[agent] = destination
+        agents = tuple(copy_agents)
+
+        unsatisfied = self.unsatisfied
+        goal = State.level.agent_goals[agent]
+        if cell != destination:
+            if cell == goal:
+                unsatisfied += 1
+            elif destination == goal:
+                unsatisfied -= 1
+
+        child = ODState(agents, self.boxes, unsatisfied)
+        child.parent = self
+        child.joint_action = (self.joint_action if agent > 0 else []) + [action]
+        if agent + 1 == len(agents):
+            # Last agent decided: the time step is complete.
+            child.g = self.g + 1
+        else:
+            child.next_agent = agent + 1
+            child.origin = self.origin
+            child.g = self.g
+
+        keys = State.zobrist_agents[agent]
+        h = hash(self) ^ _od_key(self.next_agent, self.origin) ^ keys[cell] ^ keys[destination]
+        child._hash = h ^ _od_key(child.next_agent, child.origin)
+        return child
+
+    def is_goal_state(self) -> bool:
+        return self.next_agent == 0 and self.unsatisfied == 0
+
+    def extract_plan(self) -> list[list[Action]]:
+        # Only full states carry a complete joint action; intermediate states are skipped.
+        plan = []
+        state: State | None = self
+        while state is not None and state.joint_action is not None:
+            if isinstance(state, ODState) and state.next_agent == 0:
+                plan.append(state.joint_action)
+            state = state.parent
+        plan.reverse()
+        return plan
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ODState) or not super().__eq__(other):
+            return False
+        return self.next_agent == other.next_agent and self.origin == other.origin
+
+    def __hash__(self) -> int:
+        return super().__hash__()
+
+
+def _od_key(next_agent: int, origin: tuple[int, ...]) -> int:
+    """Extra hash component separating intermediate states from the full state with the same agent positions."""
+    if next_agent == 0:
+        return 0
+    return hash((next_agent, origin)) & _HASH_MASK
@@ -0,0 +1,109 @@
+import contextlib
+import multiprocessing
+import shlex
+import sys
+import time
+
+from searchclient.action import Action
+
+# Complementary configurations: fast and unsafe first, optimal and exhaustive last.
+DEFAULT_CONFIGURATIONS = ["-greedy", "-wastar", "-astar --bucket", "-pp", "-cbs", "-astar -od"]
+
+
+def search(level_text: str, configurations: list[str], max_memory: float) -> list[list[Action]] | None:
+    """
+    Runs every configuration (a string of program arguments, e.g. "-astar --bucket") on the level in its own process,
+    each with an equal share of max_memory, returns the first plan any of them finds and terminates the others.
+    Returns None once all configurations have given up without a plan. Configurations that cannot run in a worker
+    (see configuration_error) are reported and left out.
+    """
+    from searchclient.searchclient import SearchClient
+
+    start_time = time.perf_counter()
+    valid = []
+    for configuration in configurations:
+        error = configuration_error(configuration)
+        if error is None:
+            valid.append(configuration)
+        else:
+            print(f"Portfolio: skipping '{configuration}': {error}.", file=sys.stderr, flush=True)
+    configurations = valid
+    if not configurations:
+        print("Portfolio: no configuration to run.", file=sys.stderr, flush=True)
+        return None
+    share = max_memory / len(configurations)
+    print(f"Portfolio of {len(configurations)}: {', '.join(configurations)}.", file=sys.stderr, flush=True)
+
+    _, block = SearchClient.share_level(level_text)
+    tasks = [(configuration, level_text, block.name, share) for configuration in configurations]
+    try:
+        return _run_portfolio(start_time, tasks)
+    finally:
+        block.close()
+        block.unlink()
+
+
+def configuration_error(configuration: str) -> str | None:
+    """
+    Returns why configuration cannot run in a portfolio worker, or None if it can. Checked before the pool starts:
+    argparse exits on bad arguments, which would lose the task in a worker and leave the pool waiting for it.
+    """
+    from searchclient.searchclient import build_argument_parser
+
+    try:
+        # argparse prints its errors (and -h its help) before exiting; keep them off the server connection.
+        with contextlib.redirect_stdout(sys.stderr):
+            args = build_argument_parser().parse_args(shlex.split(configuration))
+    except (SystemExit, ValueError):
+        return "invalid arguments"
+    if args.portfolio is not None or args.hda or args.independence:
+        return "-portfolio, -hda and -id start their own processes and cannot run inside a portfolio"
+    return None
+
+
+def _run_portfolio(start_time: float, tasks: list[tuple[str, str, str, float]]) -> list[list[Action]] | None:
+    # One process per configuration rather than a Pool: terminating a Pool while it still hands out tasks can deadlock
+    # on its task queue, and the winner's plan would then never be returned.
+    results = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=_run_configuration, args=(task, results), daemon=True) for task in tasks]
+    for worker in workers:
+        worker.start()
+    try:
+        for _ in workers:
+            configuration, plan = results.get()
+            elapsed_time = time.perf_counter() - start_time
+            if plan is not None:
+                print(
+                    f"Portfolio: '{configuration}' won with a plan of length {len(plan)}, Time: {elapsed_time:3.3f} s",
+                    file=sys.stderr,
+                    flush=True,
+                )
+                return plan
+            print(f"Portfolio: '{configuration}' gave up, Time: {elapsed_time:3.3f} s", file=sys.stderr, flush=True)
+    finally:
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.join()
+
+    print("Portfolio: no configuration found a plan.", file=sys.stderr, flush=True)
+    return None
+
+
+def _run_configuration(task: tuple[str, str, str, float], results: multiprocessing.Queue) -> None:
+    """
+    Worker: attaches to the shared level, parses the rest from the text, solves it with the configuration and puts
+    (configuration, plan) on results. A configuration that fails puts a None plan, so the portfolio never waits for it.
+    """
+    from searchclient.searchclient import SearchClient
+
+    configuration, level_text, block_name, max_memory = task
+    plan = None
+    try:
+        args_text = [*shlex.split(configuration), "--max-memory", str(max_memory)]
+        args, initial_state = SearchClient.worker_state(args_text, level_text, block_name)
+        plan = SearchClient.solve(args, initial_state)
+    except Exception as exception:
+        print(f"Portfolio: '{configuration}' failed: {exception!r}.", file=sys.stderr, flush=True)
+    finally:
+        results.put((configuration, plan))
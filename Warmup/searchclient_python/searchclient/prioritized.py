@@ -0,0 +1,108 @@
+import math
+import random
+import sys
+import time
+from array import array
+
+from searchclient import memory
+from searchclient.action import Action
+from searchclient.spacetime import Constraints, box_goals_met, merge_paths, plan_agent
+from searchclient.state import State
+
+
+class ReservationTable:
+    """
+    Space-time cells claimed by the agents planned so far.
+
+    A later agent may not be in a cell one step before, at, or one step after a time an earlier agent is there:
+    being there at the same time is a vertex conflict, and being there just before or after means one of the two moves
+    into a cell that is not free at the start of the step. Once an earlier agent has arrived at its last cell it stays
+    there for good.
+    """
+
+    def __init__(self) -> None:
+        self.vertex: set[tuple[int, int]] = set()
+        self.parked: dict[int, int] = {}  # Final cell of each planned agent -> first time step it is unavailable.
+
+    def reserve(self, path: list[int]) -> None:
+        last = len(path) - 1
+        for t, cell in enumerate(path[:-1]):
+            for reserved_time in (t - 1, t, t + 1):
+                if reserved_time >= 0:
+                    self.vertex.add((cell, reserved_time))
+        self.parked[path[-1]] = max(last - 1, 0)
+
+    def constraints(self) -> Constraints:
+        constraints = Constraints()
+        for cell, t in self.vertex:
+            constraints.add_vertex(cell, t)
+        constraints.blocked_from = dict(self.parked)
+        return constraints
+
+
+def search(initial_state: State, max_attempts: int = 20) -> list[list[Action]] | None:
+    """
+    Prioritized planning: plans the agents one by one with single-agent space-time A* (spacetime.plan_agent), each
+    avoiding the reservations of the agents before it. When an agent finds no path it is moved to the front of the
+    priority order and planning restarts, up to max_attempts orders.
+
+    Fast but neither optimal nor complete; meant for large levels where joint search is hopeless.
+    Boxes cannot move in this domain, so levels whose box goals are not already met return None.
+    """
+    start_time = time.perf_counter()
+    level = State.level
+    num_agents = len(initial_state.agents)
+
+    if not box_goals_met(initial_state):
+        print("Prioritized planning: box goals are not met and boxes cannot move.", file=sys.stderr, flush=True)
+        return None
+
+    obstacles = frozenset(initial_state.boxes)
+    goals = level.agent_goals
+    distances: list[array | None] = [level.distances_from(goal, obstacles) if goal >= 0 else None for goal in goals]
+
+    # Initial order: agents with the longest way to go first, agents without a goal last.
+    def remaining(agent: int) -> int:
+        distance_map = distances[agent]
+        return -1 if distance_map is None else distance_map[initial_state.agents[agent]]
+
+    order = sorted(range(num_agents), key=remaining, reverse=True)
+    tried: set[tuple[int, ...]] = set()
+    rng = random.Random(1)
+
+    for attempt in range(1, max_attempts + 1):
+        tried.add(tuple(order))
+        table = ReservationTable()
+        paths: list[list[int] | None] = [None] * num_agents
+        failed = None
+        for agent in order:
+            path = plan_agent(
+                level, initial_state.agents[agent], goals[agent], distances[agent], obstacles, table.constraints()
+            )
+            if path is None:
+                failed = agent
+                break
+            paths[agent] = path
+            table.reserve(path)
+
+        elapsed_time = time.perf_counter() - start_time
+        print(
+            f"Attempt {attempt}, order {order}: {'solved' if failed is None else f'agent {failed} failed'}, "
+            f"Time: {elapsed_time:3.3f} s [Alloc: {memory.get_usage():4.2f} MB]",
+            file=sys.stderr,
+            flush=True,
+        )
+        if failed is None:
+            return merge_paths(level, [path for path in paths if path is not None])
+        if memory.get_usage() > memory.max_usage:
+            print("Maximum memory usage exceeded.", file=sys.stderr, flush=True)
+            return None
+
+        # Give the failed agent the highest priority; fall back to a random order once that order has been tried.
+        order = [failed] + [agent for agent in order if agent != failed]
+        while tuple(order) in tried and len(tried) < math.factorial(num_agents):
+            rng.shuffle(order)
+
+    print("Prioritized planning: no priority order succeeded.", file=sys.stderr, flush=True)
+    return None
+
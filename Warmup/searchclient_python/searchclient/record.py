@@ -0,0 +1,26 @@
+from array import array
+
+from searchclient.state import State
+
+
+class RecordCodec:
+    """
+    Packs states into fixed-size byte records: the agent cells followed by the box cells, grouped by letter in the
+    order of the initial state, as unsigned 16-bit integers. Boxes of one letter are interchangeable, so their cells
+    are sorted and equal states always give equal records.
+    """
+
+    def __init__(self, initial_state: State) -> None:
+        self.num_agents = len(initial_state.agents)
+        self.letters = sorted(initial_state.boxes.values())
+        self.size = array("H").itemsize * (self.num_agents + len(self.letters))
+
+    def pack(self, state: State) -> bytes:
+        box_cells = [cell for _, cell in sorted((letter, cell) for cell, letter in state.boxes.items())]
+        return array("H", state.agents + tuple(box_cells)).tobytes()
+
+    def unpack(self, record: bytes) -> State:
+        cells = array("H", record)
+        agents = tuple(cells[: self.num_agents])
+        boxes = dict(zip(cells[self.num_agents :], self.letters))
+        return State(agents, boxes)
@@ -1,19 +1,26 @@
 import argparse
+import io
+import os
 import sys
-import time
+from multiprocessing import shared_memory
 from typing import TextIO
 
-from searchclient import memory
+from searchclient import anytime, cbs, externalbfs, hda, independence, memory, portfolio, prioritized, sharedlevel
+from searchclient.action import Action
+from searchclient.bitstate import BitStateSet
 from searchclient.color import Color
-from searchclient.frontier import Frontier, FrontierBestFirst, FrontierBFS, FrontierDFS
-from searchclient.graphsearch import search
-from searchclient.heuristic import HeuristicAStar, HeuristicGreedy, HeuristicWeightedAStar
+from searchclient.frontier import Frontier, FrontierBestFirst, FrontierBFS, FrontierBucket, FrontierDFS
+from searchclient.graphsearch import search, search_bidirectional, search_pooled
+from searchclient.heuristic import ESTIMATORS, Heuristic, HeuristicAStar, HeuristicGreedy, HeuristicWeightedAStar
+from searchclient.level import Level
+from searchclient.odstate import ODState
 from searchclient.state import State
 
 
 class SearchClient:
     @staticmethod
-    def parse_level(server_messages: TextIO) -> State:
+    def parse_level(server_messages: TextIO, level: Level | None = None) -> State:
+        # level is an already built index of this level (see sharedlevel.attach); otherwise it is built here.
         # We can assume that the level file is conforming to specification, since the server verifies this.
         # Read domain.
         server_messages.readline()  # #domain
@@ -55,7 +62,7 @@ class SearchClient:
         agent_rows: list[int] = [-1 for _ in range(10)]
         agent_cols: list[int] = [-1 for _ in range(10)]
         walls = [[False for _ in range(num_cols)] for _ in range(num_rows)]
-        boxes = [["" for _ in range(num_cols)] for _ in range(num_rows)]
+        box_positions: dict[tuple[int, int], str] = {}
         for row, line in enumerate(level_lines):
             for col, c in enumerate(line):
                 if "0" <= c <= "9":
@@ -63,7 +70,7 @@ class SearchClient:
                     agent_cols[ord(c) - ord("0")] = col
                     num_agents += 1
                 elif "A" <= c <= "Z":
-                    boxes[row][col] = c
+                    box_positions[(row, col)] = c
                 elif c == "+":
                     walls[row][col] = True
         del agent_rows[num_agents:]
@@ -89,18 +96,138 @@ class SearchClient:
         State.walls = walls
         State.box_colors = box_colors
         State.goals = goals
-        return State(agent_rows, agent_cols, boxes)
+        State.level = Level(walls, goals, num_agents) if level is None else level
+        State.init_zobrist(num_agents, set(box_positions.values()), State.level.num_cells)
+
+        # Positions in states are cell IDs of the static level index.
+        agents = tuple(State.level.cell_at(row, col) for row, col in zip(agent_rows, agent_cols))
+        boxes = {State.level.cell_at(row, col): letter for (row, col), letter in box_positions.items()}
+        return State(agents, boxes)
 
     @staticmethod
     def print_search_status(start_time: int, explored: set[State], frontier: Frontier) -> None:
-        elapsed_time = time.perf_counter() - start_time
-        print(
+        memory.print_status(
+            start_time,
             f"#Expanded: {len(explored):8,}, #Frontier: {frontier.size():8,}, "
-            f"#Generated: {len(explored) + frontier.size():8,}, Time: {elapsed_time:3.3f} s\n"
-            f"[Alloc: {memory.get_usage():4.2f} MB, MaxAlloc: {memory.max_usage:4.2f} MB]",
+            f"#Generated: {len(explored) + frontier.size():8,}",
+        )
+
+    @staticmethod
+    def make_frontier(args: argparse.Namespace, initial_state: State) -> Frontier:
+        """Selects the frontier of the graph-search strategies from the program arguments."""
+        if args.bfs:
+            return FrontierBFS()
+        if args.dfs:
+            return FrontierDFS()
+        best_first = FrontierBucket if args.bucket else FrontierBestFirst
+        heuristic: Heuristic | None = None
+        if args.astar:
+            heuristic = HeuristicAStar(initial_state, args.heuristic)
+        elif args.wastar is not False:
+            heuristic = HeuristicWeightedAStar(initial_state, args.wastar, args.heuristic)
+        elif args.greedy:
+            heuristic = HeuristicGreedy(initial_state, args.heuristic)
+        if heuristic is not None:
+            heuristic.cache_size = args.h_cache
+            return best_first(heuristic)
+
+        # Default to BFS search.
+        print(
+            "Defaulting to BFS search. Use arguments -bfs, -dfs, -astar, -wastar, -arastar, -greedy, -cbs, -pp or -ebfs"
+            " to set the search strategy.",
             file=sys.stderr,
             flush=True,
         )
+        return FrontierBFS()
+
+    @staticmethod
+    def initial_state(args: argparse.Namespace, level_text: str, level: Level | None = None) -> State:
+        initial_state = SearchClient.parse_level(io.StringIO(level_text), level)
+        if args.od:
+            # Operator decomposition: agents choose their actions one at a time through intermediate states.
+            initial_state = ODState.from_state(initial_state)
+        return initial_state
+
+    @staticmethod
+    def solve(args: argparse.Namespace, initial_state: State) -> list[list[Action]] | None:
+        """Runs the search strategy selected by the program arguments and returns its plan, or None."""
+        if args.cbs:
+            print("Starting conflict-based search.", file=sys.stderr, flush=True)
+            return cbs.search(initial_state)
+        if args.pp:
+            print("Starting prioritized planning.", file=sys.stderr, flush=True)
+            return prioritized.search(initial_state)
+        if args.ebfs:
+            print("Starting external-memory breadth-first search.", file=sys.stderr, flush=True)
+            return externalbfs.search(initial_state, args.spill_dir)
+        if args.arastar is not False:
+            # Admissible, so each round's plan is within its weight of the optimum.
+            heuristic = HeuristicWeightedAStar(initial_state, args.arastar, args.heuristic, admissible=True)
+            heuristic.cache_size = args.h_cache
+            print(f"Starting anytime repairing A* from weight {args.arastar}.", file=sys.stderr, flush=True)
+            return anytime.search(initial_state, heuristic, args.time_limit)
+
+        frontier = SearchClient.make_frontier(args, initial_state)
+        if args.bidirectional:
+            if isinstance(frontier, FrontierBFS) and not isinstance(initial_state, ODState):
+                print("Starting bidirectional breadth-first search.", file=sys.stderr, flush=True)
+                return search_bidirectional(initial_state)
+            print("--bidirectional only applies to -bfs without -od; ignoring it.", file=sys.stderr, flush=True)
+        print(f"Starting {frontier.get_name()}.", file=sys.stderr, flush=True)
+        seen = None
+        if args.bitstate is not None:
+            # Default size: an eighth of the memory budget.
+            size_mb = args.bitstate or max(int(args.max_memory) // 8, 1)
+            seen = BitStateSet(size_mb * 1024 * 1024)
+        if args.node_pool:
+            if isinstance(initial_state, ODState):
+                print("The node pool cannot tell -od states apart; searching without it.", file=sys.stderr, flush=True)
+            else:
+                return search_pooled(initial_state, frontier, seen)
+        return search(initial_state, frontier, seen)
+
+    @staticmethod
+    def configure(args: argparse.Namespace) -> None:
+        """Applies the program arguments that are process-wide settings."""
+        # Set max memory usage allowed (soft limit).
+        memory.max_usage = args.max_memory
+        memory.check_interval = args.memory_interval
+        memory.report_structures = args.memory_report
+        State.shuffle_expansions = args.shuffle
+        # A corridor macro is a chain of children, but the node pool and -ebfs keep only one action per state.
+        State.corridor_macros = args.corridors and not args.node_pool and not args.ebfs
+
+    @staticmethod
+    def share_level(level_text: str) -> tuple[State, shared_memory.SharedMemory]:
+        """
+        Parses the level and publishes its index for worker processes (see worker_state). Returns the initial state and
+        the shared block, which the caller closes and unlinks once the workers are done.
+        """
+        # The level index and its distance tables are built once here and shared with the workers.
+        initial_state = SearchClient.parse_level(io.StringIO(level_text))
+        return initial_state, sharedlevel.publish(State.level)
+
+    @staticmethod
+    def worker_state(args_text: list[str], level_text: str, block_name: str) -> tuple[argparse.Namespace, State]:
+        """
+        Sets up a worker process of -portfolio or -hda: applies its program arguments args_text and returns them with
+        the initial state, parsed from level_text around the level index shared in block_name (see share_level).
+        """
+        # stdout belongs to the server connection of the parent; worker output all goes to stderr.
+        sys.stdout = sys.stderr
+        args = build_argument_parser().parse_args(args_text)
+        SearchClient.configure(args)
+        return args, SearchClient.initial_state(args, level_text, sharedlevel.attach(block_name))
+
+    @staticmethod
+    def read_level(server_messages: TextIO) -> str:
+        """Reads the level description up to and including the "#end" line, for parsing or passing on to workers."""
+        lines = []
+        while True:
+            line = server_messages.readline()
+            lines.append(line)
+            if not line or line.startswith("#end"):
+                return "".join(lines)
 
     @staticmethod
     def main(args: argparse.Namespace) -> None:
@@ -121,33 +248,22 @@ class SearchClient:
         server_messages = sys.stdin
         if hasattr(server_messages, "reconfigure"):
             server_messages.reconfigure(encoding="ASCII")
-        initial_state = SearchClient.parse_level(server_messages)
-
-        # Select search strategy.
-        frontier: Frontier
-        if args.bfs:
-            frontier = FrontierBFS()
-        elif args.dfs:
-            frontier = FrontierDFS()
-        elif args.astar:
-            frontier = FrontierBestFirst(HeuristicAStar(initial_state))
-        elif args.wastar is not False:
-            frontier = FrontierBestFirst(HeuristicWeightedAStar(initial_state, args.wastar))
-        elif args.greedy:
-            frontier = FrontierBestFirst(HeuristicGreedy(initial_state))
-        else:
-            # Default to BFS search.
-            frontier = FrontierBFS()
-            print(
-                "Defaulting to BFS search. Use arguments -bfs, -dfs, -astar, -wastar, or -greedy to set the search"
-                " strategy.",
-                file=sys.stderr,
-                flush=True,
-            )
+        level_text = SearchClient.read_level(server_messages)
 
         # Search for a plan.
-        print(f"Starting {frontier.get_name()}.", file=sys.stderr, flush=True)
-        plan = search(initial_state, frontier)
+        if args.independence and (args.portfolio is not None or args.hda):
+            print("-id does not apply to -hda or -portfolio; ignoring it.", file=sys.stderr, flush=True)
+        if args.portfolio is not None:
+            plan = portfolio.search(level_text, args.portfolio or portfolio.DEFAULT_CONFIGURATIONS, args.max_memory)
+        elif args.hda:
+            print(f"Starting hash-distributed A* with {args.workers} workers.", file=sys.stderr, flush=True)
+            worker_args = ["--heuristic", args.heuristic, "--memory-interval", str(args.memory_interval)]
+            plan = hda.search(level_text, worker_args, args.workers, args.max_memory)
+        elif args.independence:
+            print("Starting independence detection.", file=sys.stderr, flush=True)
+            plan = independence.search(args, level_text)
+        else:
+            plan = SearchClient.solve(args, SearchClient.initial_state(args, level_text))
 
         # Print plan to server.
         if plan is None:
@@ -162,8 +278,7 @@ class SearchClient:
                 _response = server_messages.readline()
 
 
-if __name__ == "__main__":
-    # Program arguments.
+def build_argument_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Simple client based on state-space graph search.")
     parser.add_argument(
         "--max-memory",
@@ -172,6 +287,87 @@ if __name__ == "__main__":
         default=2048.0,
         help="The maximum memory usage allowed in MB (soft limit, default 2048).",
     )
+    parser.add_argument(
+        "--memory-interval",
+        type=int,
+        default=1000,
+        metavar="<N>",
+        help="Read the memory usage at most every N search iterations, more often near the limit (default 1000).",
+    )
+    parser.add_argument(
+        "--memory-report",
+        action="store_true",
+        help="Add estimates of the explored set and frontier sizes to the search status.",
+    )
+
+    parser.add_argument(
+        "--shuffle",
+        action="store_true",
+        help="Shuffle the child states of every expansion (seeded) instead of generating them lazily in order.",
+    )
+
+    parser.add_argument(
+        "--corridors",
+        action="store_true",
+        help="On single-agent levels, move through a whole corridor in one expansion (not with --node-pool or -ebfs).",
+    )
+
+    parser.add_argument(
+        "-od",
+        action="store_true",
+        dest="od",
+        help="Expand one agent's action at a time (operator decomposition). Combine with a strategy, e.g. -astar -od.",
+    )
+
+    parser.add_argument(
+        "-id",
+        action="store_true",
+        dest="independence",
+        help="Solve the agents in separate groups, merging only groups whose plans conflict (independence detection)."
+        " Combine with a strategy, e.g. -astar -id; ignored with -hda and -portfolio.",
+    )
+
+    parser.add_argument(
+        "--heuristic",
+        choices=ESTIMATORS,
+        default="distance",
+        help="Estimate for -astar, -wastar and -greedy: unsatisfied goal count, summed shortest-path goal distances"
+        " (default), or the same distances with the box goals of each letter matched to distinct boxes at minimum"
+        " cost instead of to the nearest box.",
+    )
+    parser.add_argument(
+        "--h-cache",
+        type=int,
+        default=0,
+        metavar="ENTRIES",
+        help="Cache up to this many heuristic values by state hash, evicting the least recently used (default 0: off).",
+    )
+    parser.add_argument(
+        "--node-pool",
+        action="store_true",
+        help="Keep the search tree in typed arrays indexed by node ID instead of parent pointers between states.",
+    )
+    parser.add_argument(
+        "--bitstate",
+        type=int,
+        nargs="?",
+        const=0,
+        default=None,
+        metavar="MB",
+        help="Keep the explored states in a Bloom filter of this size (default: an eighth of --max-memory) instead of"
+        " a set. Far smaller, but a false positive can prune the way to the goal. Combine with --node-pool to free"
+        " the expanded states as well.",
+    )
+    parser.add_argument(
+        "--bidirectional",
+        action="store_true",
+        help="Run -bfs from the initial state and the goal state at once, meeting in the middle (agent-only levels).",
+    )
+    parser.add_argument(
+        "--bucket",
+        action="store_true",
+        help="Use a bucket queue on integer (f, h) instead of a heap for -astar, -wastar and -greedy; ties go to lower h.",
+    )
 
     strategy_group = parser.add_mutually_exclusive_group()
     strategy_group.add_argument("-bfs", action="store_true", dest="bfs", help="Use the BFS strategy.")
@@ -187,12 +383,70 @@ if __name__ == "__main__":
         const=5,
         help="Use the WA* strategy.",
     )
+    strategy_group.add_argument(
+        "-arastar",
+        action="store",
+        dest="arastar",
+        nargs="?",
+        type=int,
+        default=False,
+        const=5,
+        help="Use anytime repairing A*: WA* from this weight (default 5), then lower weights until --time-limit.",
+    )
     strategy_group.add_argument("-greedy", action="store_true", dest="greedy", help="Use the Greedy strategy.")
+    strategy_group.add_argument(
+        "-cbs", action="store_true", dest="cbs", help="Use conflict-based search (agent-only levels)."
+    )
+    strategy_group.add_argument(
+        "-pp", action="store_true", dest="pp", help="Use prioritized planning (fast, not optimal, agent-only levels)."
+    )
+    strategy_group.add_argument(
+        "-ebfs", action="store_true", dest="ebfs", help="Use breadth-first search with the layers kept on disk."
+    )
+    strategy_group.add_argument(
+        "-hda", action="store_true", dest="hda", help="Use hash-distributed A* over --workers processes."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        metavar="<N>",
+        help="Number of worker processes for -hda (default: one per CPU).",
+    )
+    strategy_group.add_argument(
+        "-portfolio",
+        dest="portfolio",
+        nargs="?",
+        type=lambda value: [configuration.strip() for configuration in value.split(",")],
+        default=None,
+        const=[],
+        metavar="CONFIGURATIONS",
+        help="Run several configurations in parallel processes and use the first plan found. CONFIGURATIONS is a"
+        " comma-separated list of argument strings, given as -portfolio=\"-greedy,-astar --bucket,-cbs\""
+        " (default: a built-in mix).",
+    )
+    parser.add_argument(
+        "--time-limit",
+        type=float,
+        default=540.0,
+        metavar="<s>",
+        help="Seconds after which -arastar returns its best plan so far (default 540, leaving time to send it within a"
+        " 600 s masbench Timeout).",
+    )
+    parser.add_argument(
+        "--spill-dir",
+        default=None,
+        metavar="DIR",
+        help="Directory for the layer files of -ebfs (default: the system temporary directory).",
+    )
 
-    args = parser.parse_args()
+    return parser
 
-    # Set max memory usage allowed (soft limit).
-    memory.max_usage = args.max_memory
+
+if __name__ == "__main__":
+    # Program arguments.
+    args = build_argument_parser().parse_args()
+    SearchClient.configure(args)
 
     # Run client.
     SearchClient.main(args)
@@ -0,0 +1,94 @@
+from array import array
+from multiprocessing import shared_memory
+
+from searchclient.level import Level
+
+# Header: num_rows, num_cols, num_cells, num_agents, number of box goals, number of distance tables.
+_HEADER = array("q", [0] * 6)
+_HEADER_SIZE = _HEADER.itemsize * len(_HEADER)
+
+
+def publish(level: Level) -> shared_memory.SharedMemory:
+    """
+    Copies the static level index into one block of shared memory, as flat typed buffers: the header, then as int32
+    the cell index of the grid (-1 for walls, so it doubles as the wall map), the row and column of every cell, the
+    neighbour table, the agent goals and the box goal cells, then the box goal letters as bytes, the goal cells of the
+    distance tables as int32, and the distance tables themselves as uint16, one row of num_cells per goal.
+
+    Every goal's wall-only distance map is computed first, so workers that attach get them for free.
+    The caller owns the block: close and unlink it once the workers are done.
+    """
+    goals = [goal for goal in level.agent_goals if goal >= 0] + list(level.box_goals)
+    for goal in goals:
+        level.goal_distances(goal)
+    table_goals = list(level.goal_distance_tables)
+    box_goal_cells = list(level.box_goals)
+    header = [level.num_rows, level.num_cols, level.num_cells, len(level.agent_goals), len(box_goal_cells)]
+
+    parts = [
+        array("q", header + [len(table_goals)]),
+        array("i", level.cell_ids),
+        array("i", level.cell_rows),
+        array("i", level.cell_cols),
+        array("i", level.neighbours),
+        array("i", level.agent_goals),
+        array("i", box_goal_cells),
+        array("b", _padded([ord(level.box_goals[cell]) for cell in box_goal_cells])),
+        array("i", table_goals),
+        *(level.goal_distance_tables[goal] for goal in table_goals),
+    ]
+    size = sum(part.itemsize * len(part) for part in parts)
+    block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    offset = 0
+    for part in parts:
+        data = part.tobytes()
+        block.buf[offset : offset + len(data)] = data
+        offset += len(data)
+    return block
+
+
+def attach(name: str) -> Level:
+    """
+    Returns a Level whose index and distance tables are views into the shared block name, without copying them.
+    Only the small box_goals map is rebuilt as a dict. The Level keeps the block open for as long as it lives.
+    """
+    try:
+        block = shared_memory.SharedMemory(name=name, track=False)  # type: ignore[call-arg]
+    except TypeError:
+        # Before Python 3.13 attaching always registers the block with the resource tracker. Worker processes share
+        # the tracker of the process that created the block, so this repeats its registration and is harmless.
+        block = shared_memory.SharedMemory(name=name)
+
+    buffer = block.buf
+    num_rows, num_cols, num_cells, num_agents, num_box_goals, num_tables = buffer[:_HEADER_SIZE].cast("q")
+    offset = _HEADER_SIZE
+
+    def take(typecode: str, count: int) -> memoryview:
+        nonlocal offset
+        size = array(typecode).itemsize * count
+        view = buffer[offset : offset + size].cast(typecode)
+        offset += size
+        return view
+
+    level = Level.__new__(Level)
+    level.num_rows = num_rows
+    level.num_cols = num_cols
+    level.num_cells = num_cells
+    level.cell_ids = take("i", num_rows * num_cols)
+    level.cell_rows = take("i", num_cells)
+    level.cell_cols = take("i", num_cells)
+    level.neighbours = take("i", num_cells * 4)
+    level.agent_goals = list(take("i", num_agents))
+    box_goal_cells = take("i", num_box_goals)
+    letters = take("b", len(_padded([0] * num_box_goals)))
+    level.box_goals = {cell: chr(letters[i]) for i, cell in enumerate(box_goal_cells)}
+    table_goals = take("i", num_tables)
+    level.goal_distance_tables = {goal: take("H", num_cells) for goal in table_goals}
+    level.shared_block = block
+    level.corridor_table = None
+    return level
+
+
+def _padded(values: list[int]) -> list[int]:
+    """Pads to a multiple of four bytes, keeping the int32 buffers that follow aligned."""
+    return values + [0] * (-len(values) % 4)
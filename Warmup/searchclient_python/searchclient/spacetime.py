@@ -0,0 +1,140 @@
+import heapq
+from array import array
+
+from searchclient.action import Action, ActionType
+from searchclient.level import UNREACHABLE, Level
+from searchclient.state import State
+
+# Action that moves an agent in each direction, indexed like DIRECTION_DELTAS.
+_MOVE_BY_DIRECTION = {action.agent_direction: action for action in Action if action.type is ActionType.Move}
+
+
+class Constraints:
+    """
+    Space-time cells a single agent must avoid.
+
+    vertex holds (cell, time) pairs the agent may not occupy. blocked_from maps a cell to the first time step from
+    which it is occupied for good (another agent parked there), so the agent may not occupy it at or after that time.
+    Staying put is an action like any other: occupying a cell at time t means being there at time t.
+    """
+
+    def __init__(self) -> None:
+        self.vertex: set[tuple[int, int]] = set()
+        self.blocked_from: dict[int, int] = {}
+        # Last time step at which each cell carries a vertex constraint, so the goal test can tell whether the agent
+        # may stay at its final cell forever.
+        self.last_time: dict[int, int] = {}
+
+    def add_vertex(self, cell: int, time: int) -> None:
+        self.vertex.add((cell, time))
+        if time > self.last_time.get(cell, -1):
+            self.last_time[cell] = time
+
+    def copy(self) -> "Constraints":
+        copy = Constraints()
+        copy.vertex = set(self.vertex)
+        copy.blocked_from = dict(self.blocked_from)
+        copy.last_time = dict(self.last_time)
+        return copy
+
+    def horizon(self) -> int:
+        """Time step after which the constraints no longer change, so (cell, t) and (cell, horizon) are equivalent."""
+        latest = max(self.last_time.values(), default=-1)
+        return max(latest, max(self.blocked_from.values(), default=-1)) + 1
+
+    def allows(self, cell: int, time: int) -> bool:
+        if (cell, time) in self.vertex:
+            return False
+        return time < self.blocked_from.get(cell, time + 1)
+
+
+def box_goals_met(state: State) -> bool:
+    """Only agents move in this domain, so the single-agent planners treat boxes as obstacles and need this to hold."""
+    return all(state.boxes.get(cell) == letter for cell, letter in State.level.box_goals.items())
+
+
+def plan_agent(
+    level: Level,
+    start: int,
+    goal: int,
+    distances: array | None,
+    obstacles: set[int] | frozenset[int],
+    constraints: Constraints,
+) -> list[int] | None:
+    """
+    Space-time A* for a single agent.
+
+    Returns the agent's cell at every time step from 0 until it rests at goal (or, if goal is -1, at any cell it may
+    keep forever), or None if no such path exists. distances must hold the true distance to goal for every cell
+    (see Level.distances_from) and is ignored when goal is -1. obstacles are cells that are blocked at all times.
+    """
+    horizon = constraints.horizon()
+    neighbours = level.neighbours
+    last_time = constraints.last_time
+    blocked_from = constraints.blocked_from
+
+    def heuristic(cell: int) -> int:
+        return 0 if goal < 0 else distances[cell]
+
+    if not constraints.allows(start, 0) or heuristic(start) == UNREACHABLE:
+        return None
+
+    # Open entries are (f, h, insertion order, cell, time); parents map (cell, capped time) to the previous node.
+    counter = 0
+    start_node = (start, 0)
+    open_list = [(heuristic(start), heuristic(start), counter, start, 0)]
+    parents: dict[tuple[int, int], tuple[int, int] | None] = {start_node: None}
+    closed: set[tuple[int, int]] = set()
+
+    while open_list:
+        _, _, _, cell, time = heapq.heappop(open_list)
+        key = (cell, min(time, horizon))
+        if key in closed:
+            continue
+        closed.add(key)
+
+        if (goal < 0 or cell == goal) and time > last_time.get(cell, -1) and cell not in blocked_from:
+            path = []
+            node: tuple[int, int] | None = key
+            while node is not None:
+                path.append(node[0])
+                node = parents[node]
+            path.reverse()
+            # Capped keys collapse the waiting steps after the horizon; pad them back in.
+            return path + [cell] * (time + 1 - len(path))
+
+        next_time = time + 1
+        for next_cell in (cell, *neighbours[cell * 4 : cell * 4 + 4]):
+            if next_cell < 0 or next_cell in obstacles or not constraints.allows(next_cell, next_time):
+                continue
+            h = heuristic(next_cell)
+            if h == UNREACHABLE:
+                continue
+            next_key = (next_cell, min(next_time, horizon))
+            if next_key in closed:
+                continue
+            if next_key not in parents:
+                parents[next_key] = key
+            counter += 1
+            heapq.heappush(open_list, (next_time + h, h, counter, next_cell, next_time))
+
+    return None
+
+
+def path_actions(level: Level, path: list[int]) -> list[Action]:
+    """Converts consecutive cells of a path into the Move/NoOp actions that produce them."""
+    actions = []
+    for cell, next_cell in zip(path, path[1:]):
+        if cell == next_cell:
+            actions.append(Action.NoOp)
+            continue
+        direction = list(level.neighbours[cell * 4 : cell * 4 + 4]).index(next_cell)
+        actions.append(_MOVE_BY_DIRECTION[direction])
+    return actions
+
+
+def merge_paths(level: Level, paths: list[list[int]]) -> list[list[Action]]:
+    """Turns one path per agent into a joint plan, letting agents that arrive early wait at their last cell."""
+    length = max(len(path) for path in paths)
+    agent_actions = [path_actions(level, path + [path[-1]] * (length - len(path))) for path in paths]
+    return [list(joint_action) for joint_action in zip(*agent_actions)]
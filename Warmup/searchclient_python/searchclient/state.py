@@ -1,24 +1,50 @@
 import random
+from array import array
+from collections.abc import Iterator
 from typing import ClassVar #classVar is used to indicate that the variable is a class variable, meaning it is shared among all instances of the class. In this code, agent_colors, walls, box_colors, and goals are defined as class variables, which means they are shared across all instances of the State class. This is useful for storing information that is common to all states, such as the layout of the level (walls and goals) and the colors of agents and boxes.
 
 from searchclient.action import Action, ActionType
 from searchclient.color import Color
+from searchclient.level import Level
+
+
+MOVE_ACTIONS = [action for action in Action if action.type is ActionType.Move]
 
 
 class State:
     _RNG = random.Random(1)
+    shuffle_expansions: ClassVar[bool] = False #Shuffle the children of each expansion (costs materialising them).
+    corridor_macros: ClassVar[bool] = False #On single-agent levels, move through whole corridors in one expansion.
+
+    # Only the dynamic parts of a state (agent positions and boxes) are stored per instance; everything static
+    # about the level lives in the class variables below and is never copied, hashed or compared per state.
+    __slots__ = ("agents", "boxes", "parent", "joint_action", "g", "unsatisfied", "_hash")
 
     agent_colors: ClassVar[list[Color | None]] #List of colors for each agent. Indexed by agent number. None if agent has no color.
     walls: ClassVar[list[list[bool]]] #2D list of booleans. True if there's a wall at (row, col).
     box_colors: ClassVar[list[Color | None]] #list of colors for each box. Indexed by (row, col). None if no box at (row, col).
     goals: ClassVar[list[list[str]]] #list of goals. Indexed by (row, col). Empty string if no goal at (row, col). Otherwise, the goal is represented as a single character string: "A"-"Z" for box goals and "0"-"9" for agent goals.
-
-    def __init__(self, agent_rows: list[int], agent_cols: list[int], boxes: list[list[str]]) -> None:
+    level: ClassVar[Level] #Static index of the free cells: dense cell IDs and the 4-neighbour table. Built from walls.
+
+    # Zobrist keys: one random 60-bit number per (agent, cell) and per (box letter, cell), indexed by cell ID.
+    # A state's hash is the XOR of the keys of everything it contains, so result() only XORs in what moved.
+    # Keys stay below 2**61 - 1 so hash() never reduces the value and the XOR arithmetic stays consistent.
+    zobrist_agents: ClassVar[list[list[int]]]
+    zobrist_boxes: ClassVar[dict[str, list[int]]]
+
+    @staticmethod
+    def init_zobrist(num_agents: int, box_letters: set[str], num_cells: int) -> None:
+        """Draws the Zobrist keys for the level. Seeded, so every process parsing the same level gets the same keys."""
+        rng = random.Random(0x5EED)
+        State.zobrist_agents = [[rng.getrandbits(60) for _ in range(num_cells)] for _ in range(num_agents)]
+        State.zobrist_boxes = {letter: [rng.getrandbits(60) for _ in range(num_cells)] for letter in sorted(box_letters)}
+
+    def __init__(self, agents: tuple[int, ...], boxes: dict[int, str], unsatisfied: int | None = None) -> None:
         """
         Constructs an initial state.
         Arguments are not copied, and therefore should not be modified after being passed in.
 
-        The lists walls, boxes, and goals are indexed from top-left of the level, row-major order (row, col).
+        The lists walls and goals are indexed from top-left of the level, row-major order (row, col).
                Col 0  Col 1  Col 2  Col 3
         Row 0: (0,0)  (0,1)  (0,2)  (0,3)  ...
         Row 1: (1,0)  (1,1)  (1,2)  (1,3)  ...
@@ -28,17 +54,26 @@ class State:
         For example, State.walls[2] is a list of booleans for the third row.
         State.walls[row][col] is True if there's a wall at (row, col).
 
-        The agent rows and columns are indexed by the agent number.
-        For example, State.agent_rows[0] is the row location of agent '0'.
+        Positions in a state are cell IDs from State.level rather than (row, col) pairs;
+        State.level.position(cell) converts back.
 
-        Note: The state should be considered immutable after it has been hashed, e.g. added to a dictionary or set.
+        The agent positions are a tuple indexed by the agent number.
+        For example, state.agents[0] is the cell of agent '0'.
+
+        The boxes are a sparse map from cell to the box letter; cells without a box are simply absent.
+        Child states share the boxes map with their parent when no box moved, so it must never be mutated.
+
+        unsatisfied is the number of goal cells not yet holding their agent or box. It is counted from scratch only
+        when not given; result() passes it in, updated from the cells the joint action touched.
+
+        Note: The state is immutable; only the fields above (not the static level) take part in hashing and equality.
         """
-        self.agent_rows = agent_rows
-        self.agent_cols = agent_cols
+        self.agents = agents
         self.boxes = boxes
         self.parent: State | None = None
         self.joint_action: list[Action] | None = None
         self.g = 0
+        self.unsatisfied = self.count_unsatisfied_goals() if unsatisfied is None else unsatisfied
         self._hash: int | None = None
 
     def result(self, joint_action: list[Action]) -> "State":
@@ -47,21 +82,34 @@ class State:
         Precondition: Joint action must be applicable and non-conflicting in this state.
         """
 
-        # Copy this state.
-        copy_agent_rows = self.agent_rows[:]
-        copy_agent_cols = self.agent_cols[:]
-        copy_boxes = [row[:] for row in self.boxes]
+        # Copy the agent positions; the boxes map is shared since no action moves a box.
+        copy_agents = list(self.agents)
+        neighbours = State.level.neighbours
+        zobrist_agents = State.zobrist_agents
+        agent_goals = State.level.agent_goals
+        h = hash(self)
+        unsatisfied = self.unsatisfied
 
-        # Apply each action.
+        # Apply each action, XOR'ing the moved agents out of their old cell and into their new one
+        # and updating the goal counter for the agents that leave or reach their goal.
         for agent, action in enumerate(joint_action):
             if action.type is ActionType.NoOp:
                 pass
 
             elif action.type is ActionType.Move:
-                copy_agent_rows[agent] += action.agent_row_delta
-                copy_agent_cols[agent] += action.agent_col_delta
-
-        copy_state = State(copy_agent_rows, copy_agent_cols, copy_boxes)
+                keys = zobrist_agents[agent]
+                cell = copy_agents[agent]
+                destination = neighbours[cell * 4 + action.agent_direction]
+                copy_agents[agent] = destination
+                h ^= keys[cell] ^ keys[destination]
+                goal = agent_goals[agent]
+                if cell == goal:
+                    unsatisfied += 1
+                elif destination == goal:
+                    unsatisfied -= 1
+
+        copy_state = State(tuple(copy_agents), self.boxes, unsatisfied)
+        copy_state._hash = h
 
         copy_state.parent = self
         copy_state.joint_action = joint_action.copy()
@@ -70,92 +118,127 @@ class State:
         return copy_state
 
     def is_goal_state(self) -> bool:
-        for row in range(len(State.goals)):
-            for col in range(len(State.goals[row])):
-                goal = State.goals[row][col]
-
-                if "A" <= goal <= "Z" and self.boxes[row][col] != goal:
-                    return False
-                if "0" <= goal <= "9" and not (
-                    self.agent_rows[ord(goal) - ord("0")] == row and self.agent_cols[ord(goal) - ord("0")] == col
-                ):
-                    return False
-        return True
-
-    def get_expanded_states(self) -> list["State"]:
-        num_agents = len(self.agent_rows)
-
-        # Determine list of applicable action for each individual agent.
-        applicable_actions = [
-            [action for action in Action if self.is_applicable(agent, action)] for agent in range(num_agents)
-        ]
-
-        # Iterate over joint actions, check conflict and generate child states.
-        joint_action = [Action.NoOp for _ in range(num_agents)]
-        actions_permutation = [0 for _ in range(num_agents)]
-        expanded_states = []
-        while True:
-            for agent in range(num_agents):
-                joint_action[agent] = applicable_actions[agent][actions_permutation[agent]]
-
-            if not self.is_conflicting(joint_action):
-                expanded_states.append(self.result(joint_action))
-
-            # Advance permutation.
-            done = False
-            for agent in range(num_agents):
-                if actions_permutation[agent] < len(applicable_actions[agent]) - 1:
-                    actions_permutation[agent] += 1
-                    break
-                else:  # noqa: RET508
-                    actions_permutation[agent] = 0
-                    if agent == num_agents - 1:
-                        done = True
-
-            # Last permutation?
-            if done:
-                break
+        return self.unsatisfied == 0
 
+    def count_unsatisfied_goals(self) -> int:
+        level = State.level
+        unsatisfied = sum(1 for cell, letter in level.box_goals.items() if self.boxes.get(cell) != letter)
+        unsatisfied += sum(1 for agent, goal in enumerate(level.agent_goals) if goal >= 0 and self.agents[agent] != goal)
+        return unsatisfied
+
+    def get_expanded_states(self) -> Iterator["State"]:
+        """
+        Yields the child states reachable by one applicable, non-conflicting joint action.
+        Children are produced lazily; only when State.shuffle_expansions is set are they collected and shuffled first.
+        """
+        children = self._generate_children()
+        if not State.shuffle_expansions:
+            return children
+        expanded_states = list(children)
         State._RNG.shuffle(expanded_states)
-        return expanded_states
+        return iter(expanded_states)
+
+    def _generate_children(self) -> Iterator["State"]:
+        num_agents = len(self.agents)
+        neighbours = State.level.neighbours
+        corridors = State.level.corridors() if State.corridor_macros and num_agents == 1 else None
+
+        # Determine the applicable actions of each individual agent, paired with the cell they claim (-1 for NoOp).
+        applicable_actions: list[list[tuple[Action, int]]] = []
+        for agent in range(num_agents):
+            cell = self.agents[agent]
+            agent_actions = [(Action.NoOp, -1)]
+            for action in MOVE_ACTIONS:
+                destination = neighbours[cell * 4 + action.agent_direction]
+                if self.is_free(destination):
+                    agent_actions.append((action, destination))
+            applicable_actions.append(agent_actions)
+
+        # Assign agents one at a time, backtracking as soon as an agent can only move into a cell already claimed by
+        # an earlier agent, so conflicting joint actions are never built in full.
+        joint_action = [Action.NoOp for _ in range(num_agents)]
+        chosen = [-1 for _ in range(num_agents)]  # index into applicable_actions[agent] of the current choice
+        claimed: set[int] = set()
+        agent = 0
+        while agent >= 0:
+            if agent == num_agents:
+                child = self.result(joint_action)
+                if corridors is not None and joint_action[0] is not Action.NoOp:
+                    child = child._through_corridor(self.agents[0], joint_action[0].agent_direction, corridors)
+                yield child
+                agent -= 1
+                continue
+
+            agent_actions = applicable_actions[agent]
+            index = chosen[agent]
+            if index >= 0:
+                claimed.discard(agent_actions[index][1])
+            index += 1
+            while index < len(agent_actions) and agent_actions[index][1] in claimed:
+                index += 1
+
+            if index == len(agent_actions):
+                chosen[agent] = -1
+                agent -= 1
+                continue
+
+            action, destination = agent_actions[index]
+            chosen[agent] = index
+            joint_action[agent] = action
+            if destination >= 0:
+                claimed.add(destination)
+            agent += 1
+
+    def _through_corridor(self, origin: int, direction: int, corridors: array) -> "State":
+        """
+        Continues the lone agent's move from origin in direction along the corridor it entered (see Level.corridors),
+        stopping early at a box or when a loop leads back to origin. Every step is a child of the one before, so the
+        result has the corridor's length added to g and extract_plan still returns one primitive move per step.
+        """
+        state = self
+        neighbours = State.level.neighbours
+        cell = self.agents[0]
+        step = corridors[origin * 4 + direction]
+        while step >= 0:
+            next_cell = neighbours[cell * 4 + step]
+            if next_cell == origin or next_cell in state.boxes:
+                break
+            state = state.result([MOVE_ACTIONS[step]])
+            step = corridors[cell * 4 + step]
+            cell = next_cell
+        return state
 
     def is_applicable(self, agent: int, action: Action) -> bool:
-        agent_row = self.agent_rows[agent]
-        agent_col = self.agent_cols[agent]
+        agent_cell = self.agents[agent]
         _agent_color = State.agent_colors[agent]
 
         if action.type is ActionType.NoOp:
             return True
 
         if action.type is ActionType.Move:
-            destination_row = agent_row + action.agent_row_delta
-            destination_col = agent_col + action.agent_col_delta
-            return self.is_free(destination_row, destination_col)
+            destination = State.level.neighbours[agent_cell * 4 + action.agent_direction]
+            return self.is_free(destination)
 
         assert False, f"Not implemented for action type {action.type}."
 
     def is_conflicting(self, joint_action: list[Action]) -> bool:
-        num_agents = len(self.agent_rows)
+        num_agents = len(self.agents)
+        neighbours = State.level.neighbours
 
-        destination_rows = [-1 for _ in range(num_agents)]  # row of new cell to become occupied by action
-        destination_cols = [-1 for _ in range(num_agents)]  # column of new cell to become occupied by action
-        box_rows = [-1 for _ in range(num_agents)]  # current row of box moved by action
-        box_cols = [-1 for _ in range(num_agents)]  # current column of box moved by action
+        destinations = [-1 for _ in range(num_agents)]  # new cell to become occupied by action
+        box_cells = [-1 for _ in range(num_agents)]  # current cell of box moved by action
 
         # Collect cells to be occupied and boxes to be moved.
         for agent in range(num_agents):
             action = joint_action[agent]
-            agent_row = self.agent_rows[agent]
-            agent_col = self.agent_cols[agent]
+            agent_cell = self.agents[agent]
 
             if action.type is ActionType.NoOp:
                 pass
 
             elif action.type is ActionType.Move:
-                destination_rows[agent] = agent_row + action.agent_row_delta
-                destination_cols[agent] = agent_col + action.agent_col_delta
-                box_rows[agent] = agent_row  # Distinct dummy value.
-                box_cols[agent] = agent_col  # Distinct dummy value.
+                destinations[agent] = neighbours[agent_cell * 4 + action.agent_direction]
+                box_cells[agent] = agent_cell  # Distinct dummy value.
 
         for a1 in range(num_agents):
             if joint_action[a1] is Action.NoOp:
@@ -166,18 +249,18 @@ class State:
                     continue
 
                 # Moving into same cell?
-                if destination_rows[a1] == destination_rows[a2] and destination_cols[a1] == destination_cols[a2]:
+                if destinations[a1] == destinations[a2]:
                     return True
 
         return False
 
-    def is_free(self, row: int, col: int) -> bool:
-        return not State.walls[row][col] and not self.boxes[row][col] and self.agent_at(row, col) is None
+    def is_free(self, cell: int) -> bool:
+        # Walls and the outside of the level have no cell ID, so -1 doubles as the wall check.
+        return cell >= 0 and cell not in self.boxes and cell not in self.agents
 
-    def agent_at(self, row: int, col: int) -> str | None:
-        for agent in range(len(self.agent_rows)):
-            if self.agent_rows[agent] == row and self.agent_cols[agent] == col:
-                return chr(agent + ord("0"))
+    def agent_at(self, cell: int) -> str | None:
+        if cell in self.agents:
+            return chr(self.agents.index(cell) + ord("0"))
         return None
 
     def extract_plan(self) -> list[list[Action]]:
@@ -190,16 +273,13 @@ class State:
         return plan
 
     def __hash__(self) -> int:
+        # Only the initial state computes its hash from scratch; result() maintains it incrementally for children.
         if self._hash is None:
-            prime = 31
-            h = 1
-            h = h * prime + hash(tuple(self.agent_rows))
-            h = h * prime + hash(tuple(self.agent_cols))
-            h = h * prime + hash(tuple(State.agent_colors))
-            h = h * prime + hash(tuple(tuple(row) for row in self.boxes))
-            h = h * prime + hash(tuple(State.box_colors))
-            h = h * prime + hash(tuple(tuple(row) for row in State.goals))
-            h = h * prime + hash(tuple(tuple(row) for row in State.walls))
+            h = 0
+            for agent, cell in enumerate(self.agents):
+                h ^= State.zobrist_agents[agent][cell]
+            for cell, letter in self.boxes.items():
+                h ^= State.zobrist_boxes[letter][cell]
             self._hash = h
         return self._hash
 
@@ -208,30 +288,23 @@ class State:
             return True
         if not isinstance(other, State):
             return False
-        if self.agent_rows != other.agent_rows:
-            return False
-        if self.agent_cols != other.agent_cols:
-            return False
-        if State.agent_colors != other.agent_colors:
-            return False
-        if State.walls != other.walls:
+        if hash(self) != hash(other):
             return False
-        if self.boxes != other.boxes:
+        if self.agents != other.agents:
             return False
-        if State.box_colors != other.box_colors:
-            return False
-        return State.goals == other.goals
+        return self.boxes is other.boxes or self.boxes == other.boxes
 
     def __repr__(self) -> str:
         lines = []
-        for row in range(len(self.boxes)):
+        for row in range(len(State.walls)):
             line = []
-            for col in range(len(self.boxes[row])):
-                if self.boxes[row][col]:
-                    line.append(self.boxes[row][col])
-                elif State.walls[row][col] is not None:
+            for col in range(len(State.walls[row])):
+                cell = State.level.cell_at(row, col)
+                if cell < 0:
                     line.append("+")
-                elif (agent := self.agent_at(row, col)) is not None:
+                elif cell in self.boxes:
+                    line.append(self.boxes[cell])
+                elif (agent := self.agent_at(cell)) is not None:
                     line.append(agent)
                 else:
                     line.append(" ")
@@ -242,10 +315,10 @@ class State:
 """
 Initial state is repsented as an instance of State class.
 i) Agent position:
-    Under __init__ method, agent_rows and agent_cols give agent positions.
-    # Lists indexed by agent number
-    agent_rows = [1, 3, 5]  # Agent 0 at row 1, Agent 1 at row 3, Agent 2 at row 5
-    agent_cols = [2, 4, 6]  # Agent 0 at col 2, Agent 1 at col 4, Agent 2 at col 6
+    Under __init__ method, agents gives agent positions as cell IDs (see level.py).
+    # Tuple indexed by agent number
+    agents = (4, 17, 30)  # Agent 0 at cell 4, Agent 1 at cell 17, Agent 2 at cell 30
+    State.level.position(4)  # (row, col) of agent 0
 
 ii) Agent color: (class variable, shared across all states)
     agent_colors: ClassVar[list[Color | None]]
@@ -255,14 +328,14 @@ ii) Agent color: (class variable, shared across all states)
 
 iii) Box position:
     self.boxes = boxes
-    # 2D grid, same dimensions as the level
-    # boxes[row][col] = letter if box present, empty string "" if not
+    # Sparse map from cell ID to letter, only cells holding a box are present
+    # Shared between parent and child states whenever no box moved
 
-    boxes = [
-        ["", "", "", ""],      # Row 0: no boxes
-        ["", "A", "", "B"],    # Row 1: Box A at (1,1), Box B at (1,3)
-        ["", "", "C", ""],     # Row 2: Box C at (2,2)
-    ]
+    boxes = {
+        5: "A",    # Box A at cell 5
+        7: "B",    # Box B at cell 7
+        12: "C",   # Box C at cell 12
+    }
 
 iv) Box color: (class variable, shared across all states)
     box_colors: ClassVar[list[Color | None]]
@@ -307,10 +380,11 @@ result method applies a joint action to the current state and returns the result
 """
 | Component       | Type     | Storage                      | Example                 |
 | --------------- | -------- | ---------------------------- | ----------------------- |
-| Agent positions | Instance | agent_rows[i], agent_cols[i] | [1, 3], [2, 4]          |
+| Agent positions | Instance | agents[i] (cell IDs)         | (4, 17)                 |
 | Agent colors    | Class    | agent_colors[i]              | [Color.Blue, Color.Red] |
-| Box positions   | Instance | boxes[row][col]              | [["", "A"], ["B", ""]]  |
+| Box positions   | Instance | boxes[cell]                  | {5: "A"}                |
 | Box colors      | Class    | box_colors[letter_index]     | [Color.Blue, Color.Red] |
 | Walls           | Class    | walls[row][col]              | [[True, False], ...]    |
 | Goals           | Class    | goals[row][col]              | [["", "A"], ["0", ""]]  |
+| Cell index      | Class    | level.neighbours[cell*4+dir] | see level.py            |
 """